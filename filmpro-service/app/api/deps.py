@@ -1,24 +1,39 @@
 """
 API dependencies for the FILMPRO application.
 """
-from typing import Generator
+from typing import Generator, Optional
 from fastapi import Depends
 
 from app.services.script_parser.fountain import FountainParser
 from app.services.script_analysis.element_extractor import ElementExtractor
 
+# Shared service instances, created once per process
+_script_parser = FountainParser()
+_element_extractor: Optional[ElementExtractor] = None
+
+
+async def init_services():
+    """
+    Initialize shared service instances on application startup.
+    
+    NLP models are not loaded here; the extractor loads them on first use.
+    """
+    global _element_extractor
+    if _element_extractor is None:
+        _element_extractor = ElementExtractor()
+
 
 async def get_script_parser() -> FountainParser:
     """
     Dependency to get a script parser.
     """
-    return FountainParser()
+    return _script_parser
 
 
 async def get_element_extractor() -> ElementExtractor:
     """
     Dependency to get a script element extractor.
     """
-    extractor = ElementExtractor()
-    await extractor.initialize()
-    return extractor
\ No newline at end of file
+    if _element_extractor is None:
+        await init_services()
+    return _element_extractor
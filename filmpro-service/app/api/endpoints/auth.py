@@ -1,6 +1,7 @@
 """
 Authentication endpoints for the FILMPRO API.
 """
+import asyncio
 from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -35,21 +36,25 @@ USERS = {
     }
 }
 
+# Emails are case-insensitive, so key the lookup table by lowercased email once
+USERS = {email.lower(): user for email, user in USERS.items()}
+
+# Hash checked for unknown users so that every login attempt costs one bcrypt
+# verification, whether or not the account exists
+_DUMMY_HASH = "$2b$12$GSWI.HmS9BfCCtEXRUhHKenUjChyvupli9a3CEAxfSROMd0026hbC"
+
 
 @router.post("/login", response_model=Token)
 async def login_access_token(form_data: OAuth2PasswordRequestForm = Depends()) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    user = USERS.get(form_data.username)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    user = USERS.get(form_data.username.lower())
+    hashed_password = user["hashed_password"] if user else _DUMMY_HASH
     
-    if not verify_password(form_data.password, user["hashed_password"]):
+    # bcrypt is CPU-bound; verify in a worker thread to keep the event loop free
+    password_valid = await asyncio.to_thread(verify_password, form_data.password, hashed_password)
+    if not user or not password_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
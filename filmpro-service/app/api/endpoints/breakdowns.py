@@ -1,23 +1,66 @@
 """
 API endpoints for script breakdown management.
 """
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any
+import os
+from typing import List, Optional, Dict, Any, Callable
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Path, Query, BackgroundTasks
 from beanie import PydanticObjectId
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
-from app.models.script import Script, ScriptBreakdown, Scene, SceneElement, Character, ElementType
+from app.models.script import (
+    Script, ScriptBreakdown, Scene, SceneElement, Character, ElementType, ScriptFormat, IdOnly
+)
 from app.schemas.script import (
     BreakdownCreate, BreakdownResponse, SceneResponse, SceneElementResponse, 
     CharacterResponse, AnalysisRequest, AnalysisResponse, AnalysisOptions
 )
 from app.services.script_analysis.element_extractor import ElementExtractor
+from app.services.script_parser.base import ScriptParserBase
+from app.services.script_parser.fountain import FountainParser
 from app.core.security import get_current_user
+from app.api.endpoints.common import store_parsed_cache
 from app.api.deps import get_element_extractor
 
 router = APIRouter()
 logger = logging.getLogger("filmpro")
 
+# Progress of breakdowns being processed by this worker, keyed by breakdown ID.
+# Only the terminal state is persisted, so in-flight progress is served from here.
+_breakdown_progress: Dict[PydanticObjectId, float] = {}
+
+# Parsers are stateless, so one instance per supported format is shared by all tasks
+PARSERS: Dict[ScriptFormat, ScriptParserBase] = {
+    ScriptFormat.FOUNTAIN: FountainParser(),
+}
+
+
+def _parse_oid(value: str, kind: str) -> PydanticObjectId:
+    """
+    Parse an ObjectId from a request parameter.
+    
+    Args:
+        value: Hex string to parse
+        kind: Name of the referenced resource, used in the error message
+        
+    Returns:
+        Parsed ObjectId
+        
+    Raises:
+        HTTPException: If the value is not a valid ObjectId
+    """
+    if not ObjectId.is_valid(value):
+        raise HTTPException(status_code=400, detail=f"Invalid {kind} ID format")
+    return PydanticObjectId(value)
+
+
+class _ScriptProduction(IdOnly):
+    """Projection that loads a script's ID and production."""
+    production_id: UUID
+
 
 @router.post("", response_model=BreakdownResponse, status_code=201)
 async def create_breakdown(
@@ -29,24 +72,13 @@ async def create_breakdown(
     """
     Create a new script breakdown.
     """
-    # Verify script exists
-    try:
-        script_obj_id = PydanticObjectId(breakdown_create.script_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid script ID format")
+    script_obj_id = _parse_oid(breakdown_create.script_id, "script")
     
-    script = await Script.get(script_obj_id)
+    # Verify script exists
+    script = await Script.find_one({"_id": script_obj_id}, projection_model=IdOnly)
     if not script:
         raise HTTPException(status_code=404, detail="Script not found")
     
-    # Check if breakdown already exists
-    existing_breakdown = await ScriptBreakdown.find_one({"script_id": script_obj_id}).to_list()
-    if existing_breakdown:
-        raise HTTPException(
-            status_code=409,
-            detail=f"A breakdown for this script already exists with ID: {existing_breakdown[0].id}"
-        )
-    
     # Create breakdown record
     breakdown = ScriptBreakdown(
         script_id=script_obj_id,
@@ -58,7 +90,20 @@ async def create_breakdown(
         summary_statistics={}
     )
     
-    await breakdown.insert()
+    # The unique script_id index rejects a second breakdown for the same script
+    try:
+        await breakdown.insert()
+    except DuplicateKeyError:
+        existing_breakdown = await ScriptBreakdown.find_one(
+            {"script_id": script_obj_id}, projection_model=IdOnly
+        )
+        # The conflicting breakdown may have been deleted in the meantime
+        if existing_breakdown is None:
+            raise HTTPException(status_code=409, detail="A breakdown for this script already exists")
+        raise HTTPException(
+            status_code=409,
+            detail=f"A breakdown for this script already exists with ID: {existing_breakdown.id}"
+        )
     
     # Start breakdown process in background
     background_tasks.add_task(
@@ -92,10 +137,7 @@ async def get_breakdown(
     """
     Get a script breakdown by ID.
     """
-    try:
-        breakdown_obj_id = PydanticObjectId(breakdown_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid breakdown ID format")
+    breakdown_obj_id = _parse_oid(breakdown_id, "breakdown")
     
     breakdown = await ScriptBreakdown.get(breakdown_obj_id)
     if not breakdown:
@@ -108,7 +150,7 @@ async def get_breakdown(
         created_at=breakdown.created_at,
         updated_at=breakdown.updated_at,
         is_complete=breakdown.is_complete,
-        progress=breakdown.progress,
+        progress=_breakdown_progress.get(breakdown.id, breakdown.progress),
         scene_count=breakdown.scene_count,
         page_count=breakdown.page_count,
         estimated_duration=breakdown.estimated_duration,
@@ -125,10 +167,7 @@ async def get_breakdown_by_script(
     """
     Get a script breakdown by script ID.
     """
-    try:
-        script_obj_id = PydanticObjectId(script_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid script ID format")
+    script_obj_id = _parse_oid(script_id, "script")
     
     breakdown = await ScriptBreakdown.find_one({"script_id": script_obj_id})
     if not breakdown:
@@ -141,7 +180,7 @@ async def get_breakdown_by_script(
         created_at=breakdown.created_at,
         updated_at=breakdown.updated_at,
         is_complete=breakdown.is_complete,
-        progress=breakdown.progress,
+        progress=_breakdown_progress.get(breakdown.id, breakdown.progress),
         scene_count=breakdown.scene_count,
         page_count=breakdown.page_count,
         estimated_duration=breakdown.estimated_duration,
@@ -150,6 +189,173 @@ async def get_breakdown_by_script(
     )
 
 
+def _response_projection(response_model) -> Dict[str, int]:
+    """
+    Build a MongoDB projection for the fields exposed by a response schema.
+
+    Args:
+        response_model: Pydantic response schema
+
+    Returns:
+        Projection document including every schema field except ``id``
+    """
+    return {field: 1 for field in response_model.__fields__ if field != "id"}
+
+
+_SCENE_PROJECTION = _response_projection(SceneResponse)
+_ELEMENT_PROJECTION = _response_projection(SceneElementResponse)
+_CHARACTER_PROJECTION = _response_projection(CharacterResponse)
+
+
+async def _get_breakdown_items(
+    breakdown_obj_id: PydanticObjectId,
+    document_model,
+    projection: Dict[str, int],
+    to_response: Callable[[Dict[str, Any]], Any],
+    skip: int,
+    limit: int,
+    match: Optional[Dict[str, Any]] = None
+) -> List[Any]:
+    """
+    Fetch a page of documents belonging to a breakdown's script in one round-trip.
+
+    The breakdown lookup and the page query are combined into a single
+    aggregation that joins the breakdown to ``document_model``'s collection
+    on ``script_id``. The joined documents are unwound so the cursor streams
+    them one at a time and each is converted to a response as it arrives.
+
+    Args:
+        breakdown_obj_id: Breakdown ID
+        document_model: Beanie document class to join against
+        projection: Fields to return for each joined document
+        to_response: Converts a raw joined document to its response model
+        skip: Number of documents to skip
+        limit: Maximum number of documents to return
+        match: Additional filter applied to the joined documents
+
+    Returns:
+        Response models for the joined documents
+
+    Raises:
+        HTTPException: If the breakdown does not exist
+    """
+    lookup_pipeline = []
+    if match:
+        lookup_pipeline.append({"$match": match})
+    lookup_pipeline.extend([
+        {"$skip": skip},
+        {"$limit": limit},
+        {"$project": projection}
+    ])
+
+    cursor = ScriptBreakdown.aggregate([
+        {"$match": {"_id": breakdown_obj_id}},
+        {
+            "$lookup": {
+                "from": document_model.get_motor_collection().name,
+                "localField": "script_id",
+                "foreignField": "script_id",
+                "pipeline": lookup_pipeline,
+                "as": "items"
+            }
+        },
+        # Keep a placeholder row for a breakdown without items so that an
+        # empty page can be told apart from a missing breakdown
+        {"$unwind": {"path": "$items", "preserveNullAndEmptyArrays": True}},
+        {"$replaceRoot": {"newRoot": {"$ifNull": ["$items", {}]}}}
+    ])
+
+    found = False
+    responses = []
+    async for item in cursor:
+        found = True
+        if item:
+            responses.append(to_response(item))
+
+    if not found:
+        raise HTTPException(status_code=404, detail="Breakdown not found")
+
+    return responses
+
+
+def _scene_to_response(scene: Dict[str, Any]) -> SceneResponse:
+    """
+    Build a scene response from a raw scene document without re-validation.
+    
+    Args:
+        scene: Scene document as returned by MongoDB
+        
+    Returns:
+        Scene response
+    """
+    return SceneResponse.construct(
+        id=str(scene["_id"]),
+        script_id=str(scene["script_id"]),
+        scene_number=scene["scene_number"],
+        slug_line=scene["slug_line"],
+        description=scene.get("description"),
+        page_number=scene.get("page_number"),
+        int_ext=scene.get("int_ext"),
+        location=scene.get("location"),
+        time_of_day=scene.get("time_of_day"),
+        duration_estimate=scene.get("duration_estimate"),
+        complexity_score=scene.get("complexity_score"),
+        content=scene.get("content"),
+        characters=[str(char_id) for char_id in scene.get("characters", [])],
+        elements=[str(elem_id) for elem_id in scene.get("elements", [])]
+    )
+
+
+def _element_to_response(element: Dict[str, Any]) -> SceneElementResponse:
+    """
+    Build a scene element response from a raw element document without re-validation.
+    
+    Args:
+        element: Scene element document as returned by MongoDB
+        
+    Returns:
+        Scene element response
+    """
+    return SceneElementResponse.construct(
+        id=str(element["_id"]),
+        script_id=str(element["script_id"]),
+        scene_number=element["scene_number"],
+        element_type=ElementType(element["element_type"]),
+        name=element["name"],
+        description=element.get("description"),
+        occurrences=element.get("occurrences", []),
+        context=element.get("context"),
+        importance=element.get("importance"),
+        metadata=element.get("metadata", {})
+    )
+
+
+def _character_to_response(character: Dict[str, Any]) -> CharacterResponse:
+    """
+    Build a character response from a raw character document without re-validation.
+    
+    Args:
+        character: Character document as returned by MongoDB
+        
+    Returns:
+        Character response
+    """
+    return CharacterResponse.construct(
+        id=str(character["_id"]),
+        script_id=str(character["script_id"]),
+        name=character["name"],
+        gender=character.get("gender"),
+        age_range=character.get("age_range"),
+        description=character.get("description"),
+        dialogue_count=character.get("dialogue_count", 0),
+        word_count=character.get("word_count", 0),
+        scene_appearances=character.get("scene_appearances", []),
+        character_relationships=character.get("character_relationships", {}),
+        dominant_emotions=character.get("dominant_emotions", {}),
+        importance_score=character.get("importance_score")
+    )
+
+
 @router.get("/{breakdown_id}/scenes", response_model=List[SceneResponse])
 async def get_breakdown_scenes(
     breakdown_id: str = Path(...),
@@ -160,35 +366,11 @@ async def get_breakdown_scenes(
     """
     Get scenes from a script breakdown.
     """
-    try:
-        breakdown_obj_id = PydanticObjectId(breakdown_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid breakdown ID format")
-    
-    breakdown = await ScriptBreakdown.get(breakdown_obj_id)
-    if not breakdown:
-        raise HTTPException(status_code=404, detail="Breakdown not found")
-    
-    scenes = await Scene.find({"script_id": breakdown.script_id}).skip(skip).limit(limit).to_list()
+    breakdown_obj_id = _parse_oid(breakdown_id, "breakdown")
     
-    return [
-        SceneResponse(
-            id=str(scene.id),
-            script_id=str(scene.script_id),
-            scene_number=scene.scene_number,
-            slug_line=scene.slug_line,
-            description=scene.description,
-            page_number=scene.page_number,
-            int_ext=scene.int_ext,
-            location=scene.location,
-            time_of_day=scene.time_of_day,
-            duration_estimate=scene.duration_estimate,
-            complexity_score=scene.complexity_score,
-            content=scene.content,
-            characters=[str(char_id) for char_id in scene.characters],
-            elements=[str(elem_id) for elem_id in scene.elements]
-        ) for scene in scenes
-    ]
+    return await _get_breakdown_items(
+        breakdown_obj_id, Scene, _SCENE_PROJECTION, _scene_to_response, skip, limit
+    )
 
 
 @router.get("/{breakdown_id}/elements/{element_type}", response_model=List[SceneElementResponse])
@@ -202,33 +384,12 @@ async def get_breakdown_elements(
     """
     Get elements of a specific type from a script breakdown.
     """
-    try:
-        breakdown_obj_id = PydanticObjectId(breakdown_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid breakdown ID format")
-    
-    breakdown = await ScriptBreakdown.get(breakdown_obj_id)
-    if not breakdown:
-        raise HTTPException(status_code=404, detail="Breakdown not found")
+    breakdown_obj_id = _parse_oid(breakdown_id, "breakdown")
     
-    elements = await SceneElement.find(
-        {"script_id": breakdown.script_id, "element_type": element_type}
-    ).skip(skip).limit(limit).to_list()
-    
-    return [
-        SceneElementResponse(
-            id=str(element.id),
-            script_id=str(element.script_id),
-            scene_number=element.scene_number,
-            element_type=element.element_type,
-            name=element.name,
-            description=element.description,
-            occurrences=element.occurrences,
-            context=element.context,
-            importance=element.importance,
-            metadata=element.metadata
-        ) for element in elements
-    ]
+    return await _get_breakdown_items(
+        breakdown_obj_id, SceneElement, _ELEMENT_PROJECTION, _element_to_response, skip, limit,
+        match={"element_type": element_type.value}
+    )
 
 
 @router.get("/{breakdown_id}/characters", response_model=List[CharacterResponse])
@@ -241,33 +402,11 @@ async def get_breakdown_characters(
     """
     Get characters from a script breakdown.
     """
-    try:
-        breakdown_obj_id = PydanticObjectId(breakdown_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid breakdown ID format")
-    
-    breakdown = await ScriptBreakdown.get(breakdown_obj_id)
-    if not breakdown:
-        raise HTTPException(status_code=404, detail="Breakdown not found")
-    
-    characters = await Character.find({"script_id": breakdown.script_id}).skip(skip).limit(limit).to_list()
+    breakdown_obj_id = _parse_oid(breakdown_id, "breakdown")
     
-    return [
-        CharacterResponse(
-            id=str(character.id),
-            script_id=str(character.script_id),
-            name=character.name,
-            gender=character.gender,
-            age_range=character.age_range,
-            description=character.description,
-            dialogue_count=character.dialogue_count,
-            word_count=character.word_count,
-            scene_appearances=character.scene_appearances,
-            character_relationships=character.character_relationships,
-            dominant_emotions=character.dominant_emotions,
-            importance_score=character.importance_score
-        ) for character in characters
-    ]
+    return await _get_breakdown_items(
+        breakdown_obj_id, Character, _CHARACTER_PROJECTION, _character_to_response, skip, limit
+    )
 
 
 @router.post("/analyze", response_model=AnalysisResponse)
@@ -280,21 +419,20 @@ async def analyze_script(
     """
     Analyze a script and create or update its breakdown.
     """
-    try:
-        script_obj_id = PydanticObjectId(analysis_request.script_id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid script ID format")
+    script_obj_id = _parse_oid(analysis_request.script_id, "script")
     
-    script = await Script.get(script_obj_id)
+    # Fetch script and existing breakdown concurrently
+    script, breakdown = await asyncio.gather(
+        Script.find_one({"_id": script_obj_id}, projection_model=_ScriptProduction),
+        ScriptBreakdown.find_one({"script_id": script_obj_id})
+    )
     if not script:
         raise HTTPException(status_code=404, detail="Script not found")
     
-    # Check if breakdown exists
-    breakdown = await ScriptBreakdown.find_one({"script_id": script_obj_id})
-    
     # If breakdown doesn't exist, create it
+    created = False
     if not breakdown:
-        breakdown = ScriptBreakdown(
+        new_breakdown = ScriptBreakdown(
             script_id=script_obj_id,
             production_id=script.production_id,
             is_complete=False,
@@ -303,8 +441,19 @@ async def analyze_script(
             elements_by_type={},
             summary_statistics={}
         )
-        await breakdown.insert()
-    else:
+        try:
+            await new_breakdown.insert()
+            breakdown, created = new_breakdown, True
+        except DuplicateKeyError:
+            # A concurrent request created the breakdown first; reanalyze that one
+            breakdown = await ScriptBreakdown.find_one({"script_id": script_obj_id})
+            if breakdown is None:
+                raise HTTPException(
+                    status_code=409,
+                    detail="The breakdown for this script was modified concurrently, please retry"
+                )
+    
+    if not created:
         # Reset progress if reanalyzing
         await breakdown.update({"$set": {"progress": 0.0, "is_complete": False}})
     
@@ -326,6 +475,36 @@ async def analyze_script(
     )
 
 
+async def _insert_many(document_model, documents: List[Any]):
+    """
+    Bulk insert documents, skipping the call when there is nothing to insert.
+    
+    Args:
+        document_model: Beanie document class
+        documents: Documents to insert
+    """
+    if documents:
+        await document_model.insert_many(documents)
+
+
+async def _batch_get_scenes(script_id: PydanticObjectId, scene_numbers: List[str]) -> List[Scene]:
+    """
+    Fetch a script's scenes by number in a single query.
+    
+    Args:
+        script_id: Script ID
+        scene_numbers: Scene numbers to fetch
+        
+    Returns:
+        Scenes that exist for the given numbers
+    """
+    if not scene_numbers:
+        return []
+    return await Scene.find(
+        {"script_id": script_id, "scene_number": {"$in": scene_numbers}}
+    ).to_list()
+
+
 async def _process_breakdown_background(
     breakdown_id: PydanticObjectId,
     script_id: PydanticObjectId,
@@ -343,18 +522,19 @@ async def _process_breakdown_background(
     """
     try:
         # Get script and breakdown
-        script = await Script.get(script_id)
+        script, breakdown = await asyncio.gather(
+            Script.get(script_id),
+            ScriptBreakdown.get(breakdown_id)
+        )
         if not script:
             logger.error(f"Script {script_id} not found for breakdown")
             return
         
-        breakdown = await ScriptBreakdown.get(breakdown_id)
         if not breakdown:
             logger.error(f"Breakdown {breakdown_id} not found")
             return
         
-        # Update progress
-        await breakdown.update({"$set": {"progress": 0.1}})
+        _breakdown_progress[breakdown_id] = 0.1
         
         # Check if script has been parsed
         if not script.metadata.get("parsed"):
@@ -369,10 +549,8 @@ async def _process_breakdown_background(
             return
         
         # Load script parser for the appropriate format
-        if script.format == "fountain":
-            from app.services.script_parser.fountain import FountainParser
-            parser = FountainParser()
-        else:
+        parser = PARSERS.get(script.format)
+        if parser is None:
             logger.error(f"Unsupported script format: {script.format}")
             await breakdown.update({
                 "$set": {
@@ -383,18 +561,29 @@ async def _process_breakdown_background(
             })
             return
         
-        # Parse script
-        parsed_data = await parser.parse(script.file_path)
+        # Parse script, reusing the stored parse while the file is unchanged
+        file_mtime = await asyncio.to_thread(os.path.getmtime, script.file_path)
+        if script.parsed_cache is not None and script.parsed_cache_mtime == file_mtime:
+            parsed_data = script.parsed_cache
+        else:
+            parsed_data = await parser.parse(script.file_path)
+            await store_parsed_cache(script, parsed_data, file_mtime)
         
-        # Update progress
-        await breakdown.update({"$set": {"progress": 0.3}})
+        _breakdown_progress[breakdown_id] = 0.3
         
         # Store scenes
-        scene_count = len(parsed_data.get("scenes", []))
-        for i, scene_data in enumerate(parsed_data.get("scenes", [])):
-            # Create or update scene
-            scene = await Scene.find_one({"script_id": script_id, "scene_number": scene_data["scene_number"]})
-            if not scene:
+        parsed_scenes = parsed_data.get("scenes", ())
+        scene_count = len(parsed_scenes)
+        existing_scenes = {
+            scene.scene_number: scene
+            for scene in await _batch_get_scenes(
+                script_id, [scene_data["scene_number"] for scene_data in parsed_scenes]
+            )
+        }
+        scene_docs: List[Scene] = []
+        for scene_data in parsed_scenes:
+            # Create scene if it doesn't exist yet
+            if scene_data["scene_number"] not in existing_scenes:
                 scene = Scene(
                     script_id=script_id,
                     scene_number=scene_data["scene_number"],
@@ -407,39 +596,45 @@ async def _process_breakdown_background(
                     characters=[],
                     elements=[]
                 )
-                await scene.insert()
+                existing_scenes[scene.scene_number] = scene
+                scene_docs.append(scene)
         
-        # Update progress
-        await breakdown.update({"$set": {"progress": 0.5, "scene_count": scene_count}})
+        _breakdown_progress[breakdown_id] = 0.5
         
         # Extract elements
         extracted_elements = await element_extractor.extract_elements(parsed_data)
         
-        # Update progress
-        await breakdown.update({"$set": {"progress": 0.7}})
+        _breakdown_progress[breakdown_id] = 0.7
         
-        # Store elements
+        # Fetch existing characters once instead of looking each one up
+        existing_characters = {
+            character.name: character async for character in Character.find({"script_id": script_id})
+        }
+        
+        # Collect elements for bulk insertion
         elements_by_type = {}
+        char_docs: List[Character] = []
+        element_docs: List[SceneElement] = []
         for element_type, elements in extracted_elements.items():
             elements_by_type[element_type] = len(elements)
             
             for element_data in elements:
                 if element_type == ElementType.CHARACTER:
                     # Store characters in the Character collection
-                    character = await Character.find_one({"script_id": script_id, "name": element_data["name"]})
-                    if not character:
+                    if element_data["name"] not in existing_characters:
                         character = Character(
                             script_id=script_id,
                             name=element_data["name"],
                             scene_appearances=[str(scene_num) for scene_num in element_data.get("occurrences", [])],
                             importance_score=element_data.get("importance")
                         )
-                        await character.insert()
+                        existing_characters[character.name] = character
+                        char_docs.append(character)
                 else:
                     # Store other elements in the SceneElement collection
                     for scene_num in element_data.get("occurrences", []):
                         if scene_num != "unknown":
-                            element = SceneElement(
+                            element_docs.append(SceneElement(
                                 script_id=script_id,
                                 scene_number=str(scene_num),
                                 element_type=element_type,
@@ -449,11 +644,20 @@ async def _process_breakdown_background(
                                 context=element_data.get("context"),
                                 importance=element_data.get("importance"),
                                 metadata={}
-                            )
-                            await element.insert()
+                            ))
+        
+        # One round-trip per collection instead of one per document
+        await asyncio.gather(
+            _insert_many(Scene, scene_docs),
+            _insert_many(Character, char_docs),
+            _insert_many(SceneElement, element_docs)
+        )
         
         # Calculate summary statistics
-        page_count = max([scene.get("page_number", 0) for scene in parsed_data.get("scenes", []) if scene.get("page_number")], default=0)
+        page_count = max(
+            (page for page in (scene.get("page_number") for scene in parsed_scenes) if page),
+            default=0
+        )
         estimated_duration = page_count * 1.0  # Rough estimate: 1 minute per page
         
         # Finalize breakdown
@@ -461,6 +665,7 @@ async def _process_breakdown_background(
             "$set": {
                 "progress": 1.0,
                 "is_complete": True,
+                "scene_count": scene_count,
                 "page_count": page_count,
                 "estimated_duration": estimated_duration,
                 "elements_by_type": elements_by_type,
@@ -488,4 +693,6 @@ async def _process_breakdown_background(
                 }
             })
         except Exception as update_error:
-            logger.error(f"Error updating breakdown with error status: {str(update_error)}")
\ No newline at end of file
+            logger.error(f"Error updating breakdown with error status: {str(update_error)}")
+    finally:
+        _breakdown_progress.pop(breakdown_id, None)
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""
+Helpers shared by the script and breakdown endpoints.
+"""
+import logging
+from typing import Any, Dict
+
+from app.models.script import Script
+
+logger = logging.getLogger("filmpro")
+
+
+async def store_parsed_cache(script: Script, parsed_data: Dict[str, Any], file_mtime: float) -> None:
+    """
+    Store a parse result on the script so later breakdowns can skip parsing.
+    
+    Caching is best effort: a failed write (e.g. a parse too large for a
+    single document) is logged and otherwise ignored.
+    
+    Args:
+        script: Script the parse belongs to
+        parsed_data: Parser output
+        file_mtime: Modification time of the parsed file
+    """
+    try:
+        await script.update({"$set": {"parsed_cache": parsed_data, "parsed_cache_mtime": file_mtime}})
+    except Exception as e:
+        logger.warning(f"Could not cache parsed data for script {script.id}: {str(e)}")
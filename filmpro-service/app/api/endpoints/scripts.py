@@ -1,27 +1,165 @@
 """
 API endpoints for script management.
 """
+import asyncio
+import contextlib
+import io
+import mmap
 import os
+import sys
 import logging
 import uuid
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Path, Query, BackgroundTasks
 from fastapi.responses import JSONResponse
 from beanie import PydanticObjectId
-import shutil
+from bson import Binary
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
-from app.models.script import Script, ScriptFormat
+from app.models.script import IdOnly, Script, ScriptFormat
 from app.schemas.script import ScriptCreate, ScriptUpdate, ScriptResponse, ScriptListResponse
-from app.services.script_parser.base import ScriptParserBase
+from app.services.script_parser.base import CONTENT_HASH_LENGTH, ScriptParserBase
 from app.services.script_parser.fountain import FountainParser
 from app.core.config import settings
 from app.core.security import get_current_user
+from app.api.endpoints.common import store_parsed_cache
 from app.api.deps import get_script_parser
 
 router = APIRouter()
 logger = logging.getLogger("filmpro")
 
+# Cached parser output, which can be large and is never part of a response
+_PARSE_CACHE_EXCLUDED_FIELDS = {"parsed_cache": 0, "parsed_cache_mtime": 0}
+
+# Fields that script list responses never need
+_SCRIPT_LIST_EXCLUDED_FIELDS = {"file_path": 0, "content_hash": 0, **_PARSE_CACHE_EXCLUDED_FIELDS}
+
+# sendfile() can only write to a regular file on Linux
+_SENDFILE_TO_FILE = sys.platform.startswith("linux")
+
+# Chunk size for copying uploads that are still held in memory
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _as_uuid(value: Any) -> uuid.UUID:
+    """
+    Decode a UUID field from a raw MongoDB document.
+    
+    Args:
+        value: Stored value, either a BSON UUID binary or an already decoded UUID
+        
+    Returns:
+        UUID value
+    """
+    return value.as_uuid() if isinstance(value, Binary) else value
+
+
+def _copy_upload(source: BinaryIO, file_path: str, file_size: int) -> bytes:
+    """
+    Copy a spooled upload to its final location and hash its content.
+    
+    Uploads that have rolled over to a temporary file on disk are hashed
+    through a memory map and copied in-kernel with sendfile; smaller
+    in-memory uploads are hashed and copied in chunks. Either way the
+    upload is read once and the copy is never re-read.
+    
+    Args:
+        source: Spooled upload file, positioned at the start
+        file_path: Destination path
+        file_size: Size of the upload in bytes
+        
+    Returns:
+        Content hash of the upload
+        
+    Raises:
+        OSError: If the upload could not be copied in full; the partial
+            copy is removed
+    """
+    hasher = ScriptParserBase.create_content_hasher()
+    
+    # A SpooledTemporaryFile keeps small uploads in a BytesIO until they roll
+    # over to a real file. Its fileno() would force that rollover, so look at
+    # the backing file instead to tell the two apart.
+    in_memory = isinstance(getattr(source, "_file", source), io.BytesIO)
+    
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    try:
+        with open(file_path, "wb") as out:
+            if _SENDFILE_TO_FILE and not in_memory:
+                if file_size:
+                    with mmap.mmap(source.fileno(), file_size, access=mmap.ACCESS_READ) as mapped:
+                        hasher.update(mapped)
+                offset = 0
+                while offset < file_size:
+                    sent = os.sendfile(out.fileno(), source.fileno(), offset, file_size - offset)
+                    if not sent:
+                        raise OSError(f"Upload ended after {offset} of {file_size} bytes")
+                    offset += sent
+            else:
+                for chunk in iter(lambda: source.read(_COPY_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+                    out.write(chunk)
+    except Exception:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(file_path)
+        raise
+    
+    return hasher.digest(length=CONTENT_HASH_LENGTH)
+
+
+def _script_to_response(script: Script) -> ScriptResponse:
+    """
+    Build a script response from a script document without re-validation.
+    
+    Args:
+        script: Script document
+        
+    Returns:
+        Script response
+    """
+    return ScriptResponse.construct(
+        id=str(script.id),
+        title=script.title,
+        production_id=script.production_id,
+        format=script.format,
+        version=script.version,
+        author=script.author,
+        upload_date=script.upload_date,
+        modified_date=script.modified_date,
+        original_filename=script.original_filename,
+        metadata=script.metadata,
+        is_active=script.is_active,
+        is_locked=script.is_locked
+    )
+
+
+def _raw_script_to_response(script: Dict[str, Any]) -> ScriptResponse:
+    """
+    Build a script response from a raw script document without re-validation.
+    
+    Args:
+        script: Script document as returned by MongoDB
+        
+    Returns:
+        Script response
+    """
+    return ScriptResponse.construct(
+        id=str(script["_id"]),
+        title=script["title"],
+        production_id=_as_uuid(script["production_id"]),
+        format=ScriptFormat(script["format"]),
+        version=script["version"],
+        author=script.get("author"),
+        upload_date=script["upload_date"],
+        modified_date=script["modified_date"],
+        original_filename=script["original_filename"],
+        metadata=script.get("metadata", {}),
+        is_active=script.get("is_active", True),
+        is_locked=script.get("is_locked", False)
+    )
+
 
 @router.post("", response_model=ScriptResponse, status_code=201)
 async def create_script(
@@ -37,47 +175,24 @@ async def create_script(
     """
     Upload a new script and create a script record.
     """
-    # Check if file size is within limits
-    file_size = 0
-    chunk_size = 1024 * 1024  # 1MB
+    # Check if file size is within limits; the upload is already spooled, so
+    # its size is known without reading it
     max_size = settings.MAX_SCRIPT_SIZE_MB * 1024 * 1024
-    
-    chunks = []
-    while True:
-        chunk = await file.read(chunk_size)
-        if not chunk:
-            break
-        chunks.append(chunk)
-        file_size += len(chunk)
-        if file_size > max_size:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large. Maximum size is {settings.MAX_SCRIPT_SIZE_MB}MB"
-            )
-    
-    # Save file to disk
-    os.makedirs(settings.SCRIPT_UPLOAD_DIR, exist_ok=True)
-    file_path = os.path.join(settings.SCRIPT_UPLOAD_DIR, f"{uuid.uuid4()}{os.path.splitext(file.filename)[1]}")
-    
-    with open(file_path, "wb") as f:
-        for chunk in chunks:
-            f.write(chunk)
-    
-    # Calculate hash for deduplication
-    content_hash = ScriptParserBase.calculate_file_hash(file_path)
-    
-    # Check for duplicate script
-    existing_script = await Script.find_one({"content_hash": content_hash, "production_id": production_id}).to_list()
-    if existing_script:
-        # Remove the uploaded file
-        os.remove(file_path)
+    file_size = file.file.seek(0, os.SEEK_END)
+    file.file.seek(0)
+    if file_size > max_size:
         raise HTTPException(
-            status_code=409,
-            detail=f"A script with the same content already exists with ID: {existing_script[0].id}"
+            status_code=413,
+            detail=f"File too large. Maximum size is {settings.MAX_SCRIPT_SIZE_MB}MB"
         )
     
+    # Save file to disk, hashing it for deduplication on the way; filesystem
+    # work runs in worker threads to keep the event loop free
+    file_path = os.path.join(settings.SCRIPT_UPLOAD_DIR, f"{uuid.uuid4()}{os.path.splitext(file.filename)[1]}")
+    content_hash = await asyncio.to_thread(_copy_upload, file.file, file_path, file_size)
+    
     # Detect format
-    script_format = ScriptParserBase.detect_format(file_path)
+    script_format = await asyncio.to_thread(ScriptParserBase.detect_format, file_path)
     
     # Create script record
     script = Script(
@@ -89,30 +204,30 @@ async def create_script(
         file_path=file_path,
         original_filename=file.filename,
         content_hash=content_hash,
-        upload_date=datetime.utcnow(),
-        modified_date=datetime.utcnow(),
         metadata={}
     )
     
-    await script.insert()
+    # The unique (production_id, content_hash) index rejects duplicate uploads
+    try:
+        await script.insert()
+    except DuplicateKeyError:
+        # Remove the uploaded file
+        await asyncio.to_thread(os.remove, file_path)
+        existing_script = await Script.find_one(
+            {"content_hash": content_hash, "production_id": production_id}, projection_model=IdOnly
+        )
+        # The conflicting script may have been deleted in the meantime
+        if existing_script is None:
+            raise HTTPException(status_code=409, detail="A script with the same content already exists")
+        raise HTTPException(
+            status_code=409,
+            detail=f"A script with the same content already exists with ID: {existing_script.id}"
+        )
     
     # Schedule parsing in background
     background_tasks.add_task(_parse_script_background, script.id, script_parser)
     
-    return ScriptResponse(
-        id=str(script.id),
-        title=script.title,
-        production_id=script.production_id,
-        format=script.format,
-        version=script.version,
-        author=script.author,
-        upload_date=script.upload_date,
-        modified_date=script.modified_date,
-        original_filename=script.original_filename,
-        metadata=script.metadata,
-        is_active=script.is_active,
-        is_locked=script.is_locked
-    )
+    return _script_to_response(script)
 
 
 @router.get("", response_model=ScriptListResponse)
@@ -129,26 +244,29 @@ async def list_scripts(
     if production_id:
         query["production_id"] = production_id
     
-    total = await Script.find(query).count()
-    scripts = await Script.find(query).skip(skip).limit(limit).to_list()
+    page_stages = [
+        {"$skip": skip},
+        {"$limit": limit},
+        {"$project": _SCRIPT_LIST_EXCLUDED_FIELDS}
+    ]
+    
+    if query:
+        # Fetch the page and the total count in a single round-trip
+        results = await Script.find(query).aggregate([
+            {"$sort": {"upload_date": -1}},
+            {"$facet": {"items": page_stages, "total": [{"$count": "n"}]}}
+        ]).to_list()
+        items = results[0]["items"]
+        total = results[0]["total"][0]["n"] if results[0]["total"] else 0
+    else:
+        # Without a filter the total comes from collection metadata instead of a scan
+        items, total = await asyncio.gather(
+            Script.aggregate([{"$sort": {"upload_date": -1}}, *page_stages]).to_list(),
+            Script.get_motor_collection().estimated_document_count()
+        )
     
     return ScriptListResponse(
-        scripts=[
-            ScriptResponse(
-                id=str(script.id),
-                title=script.title,
-                production_id=script.production_id,
-                format=script.format,
-                version=script.version,
-                author=script.author,
-                upload_date=script.upload_date,
-                modified_date=script.modified_date,
-                original_filename=script.original_filename,
-                metadata=script.metadata,
-                is_active=script.is_active,
-                is_locked=script.is_locked
-            ) for script in scripts
-        ],
+        scripts=[_raw_script_to_response(script) for script in items],
         total=total
     )
 
@@ -166,24 +284,13 @@ async def get_script(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid script ID format")
     
-    script = await Script.get(script_obj_id)
+    script = await Script.get_motor_collection().find_one(
+        {"_id": script_obj_id}, projection=_PARSE_CACHE_EXCLUDED_FIELDS
+    )
     if not script:
         raise HTTPException(status_code=404, detail="Script not found")
     
-    return ScriptResponse(
-        id=str(script.id),
-        title=script.title,
-        production_id=script.production_id,
-        format=script.format,
-        version=script.version,
-        author=script.author,
-        upload_date=script.upload_date,
-        modified_date=script.modified_date,
-        original_filename=script.original_filename,
-        metadata=script.metadata,
-        is_active=script.is_active,
-        is_locked=script.is_locked
-    )
+    return _raw_script_to_response(script)
 
 
 @router.patch("/{script_id}", response_model=ScriptResponse)
@@ -200,36 +307,29 @@ async def update_script(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid script ID format")
     
-    script = await Script.get(script_obj_id)
-    if not script:
-        raise HTTPException(status_code=404, detail="Script not found")
-    
-    # Prevent updates if script is locked
-    if script.is_locked and not script_update.is_locked:
-        raise HTTPException(status_code=403, detail="Script is locked and cannot be updated")
+    # Locked scripts can only be updated by a request that keeps them locked
+    query = {"_id": script_obj_id}
+    if not script_update.is_locked:
+        query["is_locked"] = {"$ne": True}
     
+    collection = Script.get_motor_collection()
     update_data = script_update.dict(exclude_unset=True)
     if update_data:
-        update_data["modified_date"] = datetime.utcnow()
-        await script.update({"$set": update_data})
+        update_data["modified_date"] = datetime.now(timezone.utc)
+        script = await collection.find_one_and_update(
+            query, {"$set": update_data},
+            projection=_PARSE_CACHE_EXCLUDED_FIELDS, return_document=ReturnDocument.AFTER
+        )
+    else:
+        script = await collection.find_one(query, projection=_PARSE_CACHE_EXCLUDED_FIELDS)
     
-    # Refresh from database
-    script = await Script.get(script_obj_id)
+    if script is None:
+        # Tell a missing script apart from a locked one
+        if await collection.count_documents({"_id": script_obj_id}, limit=1):
+            raise HTTPException(status_code=403, detail="Script is locked and cannot be updated")
+        raise HTTPException(status_code=404, detail="Script not found")
     
-    return ScriptResponse(
-        id=str(script.id),
-        title=script.title,
-        production_id=script.production_id,
-        format=script.format,
-        version=script.version,
-        author=script.author,
-        upload_date=script.upload_date,
-        modified_date=script.modified_date,
-        original_filename=script.original_filename,
-        metadata=script.metadata,
-        is_active=script.is_active,
-        is_locked=script.is_locked
-    )
+    return _raw_script_to_response(script)
 
 
 @router.delete("/{script_id}", status_code=204)
@@ -254,11 +354,12 @@ async def delete_script(
         raise HTTPException(status_code=403, detail="Script is locked and cannot be deleted")
     
     # Delete the script file
-    if os.path.exists(script.file_path):
-        try:
-            os.remove(script.file_path)
-        except Exception as e:
-            logger.error(f"Error deleting script file: {str(e)}")
+    try:
+        await asyncio.to_thread(os.remove, script.file_path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error(f"Error deleting script file: {str(e)}")
     
     # Delete the script record
     await script.delete()
@@ -281,20 +382,30 @@ async def _parse_script_background(script_id: PydanticObjectId, parser: ScriptPa
             return
         
         # Parse the script
+        file_mtime = await asyncio.to_thread(os.path.getmtime, script.file_path)
         parsed_data = await parser.parse(script.file_path)
         
         # Update script metadata with parsed information
         metadata = script.metadata or {}
         metadata.update({
             "parsed": True,
-            "parse_date": datetime.utcnow().isoformat(),
+            "parse_date": datetime.now(timezone.utc).isoformat(),
             "scene_count": len(parsed_data.get("scenes", [])),
             "character_count": len(parsed_data.get("characters", [])),
             "parse_metadata": parsed_data.get("metadata", {})
         })
         
         # Update the script record
-        await script.update({"$set": {"metadata": metadata, "modified_date": datetime.utcnow()}})
+        await script.update({
+            "$set": {
+                "metadata": metadata,
+                "modified_date": datetime.now(timezone.utc)
+            }
+        })
+        
+        # Keep the parse so breakdowns can reuse it; a cache that cannot be
+        # stored must not undo the script being marked as parsed
+        await store_parsed_cache(script, parsed_data, file_mtime)
         
         logger.info(f"Successfully parsed script {script_id}")
     except Exception as e:
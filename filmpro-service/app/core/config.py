@@ -3,7 +3,7 @@ Configuration settings for the FILMPRO script analysis service.
 """
 import os
 from pydantic import BaseSettings, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
 
 class Settings(BaseSettings):
@@ -13,10 +13,15 @@ class Settings(BaseSettings):
     APP_NAME: str = "FILMPRO Script Analysis Service"
     API_V1_PREFIX: str = "/api/v1"
     DEBUG: bool = Field(False, env="DEBUG")
+    # Directory with swagger-ui-bundle.js, swagger-ui.css and redoc.standalone.js;
+    # the docs pages load them from a CDN when unset
+    DOCS_STATIC_DIR: Optional[str] = Field(None, env="DOCS_STATIC_DIR")
     
     # CORS settings
-    CORS_ORIGINS: List[str] = ["*"]
+    CORS_ORIGINS: Tuple[str, ...] = ("*",)
+    CORS_ORIGIN_REGEX: Optional[str] = Field(None, env="CORS_ORIGIN_REGEX")
     CORS_ALLOW_CREDENTIALS: bool = True
+    CORS_MAX_AGE: int = 86400  # Let browsers cache preflight responses for a day
     
     # Security settings
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
@@ -25,6 +30,11 @@ class Settings(BaseSettings):
     # Database settings
     MONGO_URI: str = Field(..., env="MONGO_URI")
     MONGO_DB_NAME: str = Field("filmpro_scripts", env="MONGO_DB_NAME")
+    MONGO_MAX_POOL_SIZE: int = Field(32, env="MONGO_MAX_POOL_SIZE")
+    MONGO_MIN_POOL_SIZE: int = Field(8, env="MONGO_MIN_POOL_SIZE")
+    MONGO_MAX_IDLE_TIME_MS: int = Field(300000, env="MONGO_MAX_IDLE_TIME_MS")
+    MONGO_COMPRESSORS: str = Field("zstd,zlib", env="MONGO_COMPRESSORS")
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = Field(2000, env="MONGO_SERVER_SELECTION_TIMEOUT_MS")
     
     # Storage settings
     SCRIPT_UPLOAD_DIR: str = Field("/tmp/filmpro/scripts", env="SCRIPT_UPLOAD_DIR")
@@ -32,6 +42,10 @@ class Settings(BaseSettings):
     
     # NLP settings
     SPACY_MODEL: str = "en_core_web_md"
+    # Action text shorter than this skips named entity recognition unless it
+    # has a capitalized word mid-sentence; regex patterns alone find the
+    # props of short scripts
+    NER_MIN_CHARS: int = Field(2000, env="NER_MIN_CHARS")
     
     class Config:
         env_file = ".env"
@@ -1,34 +1,48 @@
 """
 Logging configuration for the FILMPRO script analysis service.
 """
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 from pathlib import Path
+from typing import Optional
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_DIR = "logs"
 
+# Background listener that performs the actual console and file writes
+_queue_listener: Optional[QueueListener] = None
+
 
 def configure_logging():
-    """Configure logging for the application."""
-    # Create logs directory if it doesn't exist
-    Path(LOG_DIR).mkdir(exist_ok=True)
+    """
+    Configure logging for the application.
+    
+    Records are put on a queue by the ``filmpro`` logger and written to the
+    console and log file by a background listener thread, so logging calls
+    never block on I/O.
+    """
+    global _queue_listener
     
     # Create logger
     logger = logging.getLogger("filmpro")
-    logger.setLevel(getattr(logging, LOG_LEVEL))
     
-    # Prevent duplicate logs
+    # Prevent duplicate logs; later calls are a no-op
     if logger.handlers:
         return logger
     
+    logger.setLevel(getattr(logging, LOG_LEVEL))
+    
+    # Create logs directory if it doesn't exist
+    Path(LOG_DIR).mkdir(exist_ok=True)
+    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-    logger.addHandler(console_handler)
     
     # File handler
     file_handler = RotatingFileHandler(
@@ -37,11 +51,27 @@ def configure_logging():
         backupCount=10
     )
     file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-    logger.addHandler(file_handler)
+    
+    # Hand records to the real handlers through a queue
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _queue_listener = QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
+    atexit.register(stop_logging)
     
     # Set log level for other libraries
     logging.getLogger("uvicorn").setLevel(logging.WARNING)
     logging.getLogger("fastapi").setLevel(logging.WARNING)
     
     logger.info("Logging configured")
-    return logger
\ No newline at end of file
+    return logger
+
+
+def stop_logging():
+    """Flush queued log records and stop the background listener."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
\ No newline at end of file
@@ -1,8 +1,11 @@
 """
 Security utilities for authentication and authorization.
 """
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Union
+import functools
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple, Union
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -11,12 +14,21 @@ from pydantic import ValidationError
 
 from app.core.config import settings
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # OAuth2 token URL
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
+# JWT decoding options; only the claims we rely on are required
+_JWT_ALGORITHMS = ["HS256"]
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+
+# Recently verified tokens, mapped to (cache expiry timestamp, user ID).
+# Entries expire after at most _TOKEN_CACHE_TTL seconds and never outlive the
+# token itself.
+_TOKEN_CACHE_MAX_SIZE = 10000
+_TOKEN_CACHE_TTL = 60
+_token_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     """
@@ -30,15 +42,29 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
         JWT token string
     """
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = datetime.now(timezone.utc) + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
 
+@functools.cache
+def _pwd_context() -> CryptContext:
+    """
+    Get the password hashing context, creating it on first use.
+    
+    Building the context loads and self-tests the bcrypt backend, so it is
+    deferred until a password is actually hashed or verified.
+    
+    Returns:
+        Password hashing context
+    """
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against a hash.
@@ -50,7 +76,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if the password matches the hash
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -63,7 +89,7 @@ def get_password_hash(password: str) -> str:
     Returns:
         Hashed password
     """
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
@@ -82,8 +108,18 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any
     # NOTE: This is a simplified version for the MVP - in a real system, we would
     # validate against the user database and include additional user info
     
+    now = time.time()
+    cached = _token_cache.get(token)
+    if cached is not None:
+        if cached[0] > now:
+            _token_cache.move_to_end(token)
+            return {"id": cached[1]}
+        del _token_cache[token]
+    
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS
+        )
         user_id: str = payload.get("sub")
         if user_id is None:
             raise HTTPException(
@@ -92,6 +128,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> Dict[str, Any
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        _token_cache[token] = (min(payload["exp"], now + _TOKEN_CACHE_TTL), user_id)
+        if len(_token_cache) > _TOKEN_CACHE_MAX_SIZE:
+            _token_cache.popitem(last=False)
+        
         # In a real system, we would fetch user details from the database here
         # For MVP, we'll just return the user ID
         return {"id": user_id}
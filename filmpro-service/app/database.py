@@ -1,25 +1,57 @@
 """
 Database connection and initialization for the FILMPRO application.
 """
+import asyncio
 import logging
 import motor.motor_asyncio
 from beanie import init_beanie
-from typing import List, Type
+from typing import List, Optional, Type
 
 from app.models.script import Script, Scene, SceneElement, Character, ScriptBreakdown
 from app.core.config import settings
 
 logger = logging.getLogger("filmpro")
 
+# Shared client so repeated or concurrent startups reuse a single pool. The lock
+# is created lazily so it binds to the running event loop.
+_db_client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+_db_lock: Optional[asyncio.Lock] = None
+
 
 async def init_db():
     """
     Initialize database connection and Beanie ODM.
+    
+    Returns the already connected client if there is one.
+    """
+    global _db_client, _db_lock
+    if _db_client is not None:
+        return _db_client
+    if _db_lock is None:
+        _db_lock = asyncio.Lock()
+    async with _db_lock:
+        if _db_client is None:
+            _db_client = await _connect()
+    return _db_client
+
+
+async def _connect() -> motor.motor_asyncio.AsyncIOMotorClient:
+    """
+    Connect to MongoDB, initialize Beanie and warm the connection pool.
     """
     try:
         # Connect to MongoDB
         logger.info(f"Connecting to MongoDB at {settings.MONGO_URI}")
-        client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGO_URI)
+        client = motor.motor_asyncio.AsyncIOMotorClient(
+            settings.MONGO_URI,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+            compressors=settings.MONGO_COMPRESSORS,
+            zlibCompressionLevel=-1,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            retryWrites=True
+        )
         
         # Initialize Beanie with document models
         models: List[Type] = [Script, Scene, SceneElement, Character, ScriptBreakdown]
@@ -28,6 +60,8 @@ async def init_db():
             document_models=models
         )
         
+        await _warm_connection_pool(client)
+        
         logger.info(f"Connected to MongoDB database: {settings.MONGO_DB_NAME}")
         return client
     except Exception as e:
@@ -35,10 +69,29 @@ async def init_db():
         raise
 
 
+async def _warm_connection_pool(client: motor.motor_asyncio.AsyncIOMotorClient):
+    """
+    Open the pool's minimum number of connections before serving requests.
+    
+    Sockets are otherwise opened lazily, so the first requests would pay the
+    connection handshake. Concurrent pings each check out their own socket.
+    
+    Args:
+        client: MongoDB client
+    """
+    await client.admin.command("ping")
+    await asyncio.gather(
+        *(client.admin.command("ping") for _ in range(settings.MONGO_MIN_POOL_SIZE))
+    )
+
+
 async def close_db(client):
     """
     Close database connection.
     """
+    global _db_client
+    if client is _db_client:
+        _db_client = None
     if client:
         logger.info("Closing MongoDB connection")
         client.close()
\ No newline at end of file
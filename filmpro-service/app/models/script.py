@@ -2,11 +2,18 @@
 Database models for the Script and Breakdown objects.
 Using Pydantic models with MongoDB through Beanie ODM.
 """
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
 from enum import Enum
 from uuid import UUID, uuid4
 from beanie import Document, Link, Insert, Replace, PydanticObjectId
+from pydantic import BaseModel, Field
+from pymongo import IndexModel
+
+
+def _utcnow() -> datetime:
+    """Current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
 
 
 class ScriptFormat(str, Enum):
@@ -36,6 +43,11 @@ class ElementType(str, Enum):
     OTHER = "other"
 
 
+class IdOnly(BaseModel):
+    """Projection that loads only a document's ID."""
+    id: PydanticObjectId = Field(alias="_id")
+
+
 class Script(Document):
     """Script document model."""
     title: str
@@ -43,21 +55,23 @@ class Script(Document):
     format: ScriptFormat
     version: str
     author: Optional[str] = None
-    upload_date: datetime = datetime.utcnow()
-    modified_date: datetime = datetime.utcnow()
+    upload_date: datetime = Field(default_factory=_utcnow)
+    modified_date: datetime = Field(default_factory=_utcnow)
     file_path: str
     original_filename: str
-    content_hash: str  # MD5 hash of file content for deduplication
+    content_hash: bytes  # 16-byte BLAKE3 digest of file content for deduplication
     metadata: Dict[str, Any] = {}
     is_active: bool = True
     is_locked: bool = False
+    parsed_cache: Optional[Dict[str, Any]] = None  # Last parser output, reused while the file is unchanged
+    parsed_cache_mtime: Optional[float] = None  # File modification time the cached parse was made from
     
     class Settings:
         name = "scripts"
         indexes = [
-            "production_id",
-            ("production_id", "version"),
-            "content_hash"
+            [("production_id", 1), ("version", 1)],
+            [("production_id", 1), ("upload_date", -1)],
+            IndexModel([("production_id", 1), ("content_hash", 1)], unique=True)
         ]
 
 
@@ -76,9 +90,9 @@ class SceneElement(Document):
     class Settings:
         name = "scene_elements"
         indexes = [
-            "script_id",
-            ("script_id", "element_type"),
-            ("script_id", "scene_number")
+            [("script_id", 1), ("element_type", 1)],
+            [("script_id", 1), ("scene_number", 1)],
+            [("script_id", 1), ("name", 1)]
         ]
 
 
@@ -101,8 +115,7 @@ class Scene(Document):
     class Settings:
         name = "scenes"
         indexes = [
-            "script_id",
-            ("script_id", "scene_number")
+            [("script_id", 1), ("scene_number", 1)]
         ]
 
 
@@ -110,8 +123,8 @@ class ScriptBreakdown(Document):
     """Overall breakdown of a script."""
     script_id: PydanticObjectId
     production_id: UUID
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=_utcnow)
+    updated_at: datetime = Field(default_factory=_utcnow)
     is_complete: bool = False
     progress: float = 0.0  # 0-1 progress of breakdown process
     scene_count: int = 0
@@ -123,7 +136,7 @@ class ScriptBreakdown(Document):
     class Settings:
         name = "script_breakdowns"
         indexes = [
-            "script_id",
+            IndexModel([("script_id", 1)], unique=True),
             "production_id"
         ]
 
@@ -145,6 +158,5 @@ class Character(Document):
     class Settings:
         name = "characters"
         indexes = [
-            "script_id",
-            ("script_id", "name")
+            [("script_id", 1), ("name", 1)]
         ]
\ No newline at end of file
@@ -1,60 +1,214 @@
 """
 Service launcher for setting up the application.
+
+``create_application`` is an ASGI application factory, so each worker builds
+its own app after forking:
+
+    uvicorn app.service_launcher:create_application --factory --workers N \
+        --loop uvloop --http httptools
 """
+import functools
 import logging
-from fastapi import FastAPI
+import time
+import orjson
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from fastapi.responses import ORJSONResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.core.config import settings
 from app.database import init_db, close_db
+from app.api.deps import init_services
+from app.api.endpoints import scripts, breakdowns, auth
 from app.core.logging import configure_logging
 
 logger = logging.getLogger("filmpro")
 
+# Immutable values computed at import, so forked workers share them
+_ALLOW_ALL = ("*",)
+_API_PREFIX = settings.API_V1_PREFIX
+_OPENAPI_URL = f"{_API_PREFIX}/openapi.json" if settings.DEBUG else None
+_DOCS_URL = f"{_API_PREFIX}/docs" if settings.DEBUG else None
+_REDOC_URL = f"{_API_PREFIX}/redoc" if settings.DEBUG else None
+_HEALTH_PATH = "/health"
+
 
-async def startup_db_client(app: FastAPI):
+class OriginGatedCORSMiddleware:
     """
-    Initialize database connection on application startup.
+    CORS middleware that only handles requests carrying an Origin header.
+    
+    Same-origin and non-browser requests have no Origin header and don't need
+    CORS processing, so they are passed straight to the application.
     """
-    app.mongodb_client = await init_db()
+    
+    def __init__(self, app: ASGIApp, **cors_options: Any):
+        self.app = app
+        self.cors = CORSMiddleware(app, **cors_options)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            for name, _ in scope["headers"]:
+                if name == b"origin":
+                    await self.cors(scope, receive, send)
+                    return
+        await self.app(scope, receive, send)
 
 
-async def shutdown_db_client(app: FastAPI):
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """
-    Close database connection on application shutdown.
+    Set up shared resources on startup and release them on shutdown.
+    
+    Args:
+        app: FastAPI application
     """
-    await close_db(app.mongodb_client)
+    app.state.mongodb_client = await init_db()
+    await init_services()
+    try:
+        yield
+    finally:
+        await close_db(app.state.mongodb_client)
 
 
+def _mount_docs(app: FastAPI) -> None:
+    """
+    Serve the OpenAPI schema and docs pages from prebuilt bytes.
+    
+    The schema and HTML are generated once, after all routes are registered.
+    Swagger UI and ReDoc assets are served locally when DOCS_STATIC_DIR is set.
+    
+    Args:
+        app: FastAPI application with all routes included
+    """
+    title = app.title
+    swagger_kwargs = {}
+    redoc_kwargs = {}
+    if settings.DOCS_STATIC_DIR:
+        static_url = f"{_API_PREFIX}/docs-static"
+        app.mount(static_url, StaticFiles(directory=settings.DOCS_STATIC_DIR), name="docs-static")
+        swagger_kwargs = {
+            "swagger_js_url": f"{static_url}/swagger-ui-bundle.js",
+            "swagger_css_url": f"{static_url}/swagger-ui.css",
+        }
+        redoc_kwargs = {"redoc_js_url": f"{static_url}/redoc.standalone.js"}
+    
+    schema_bytes = orjson.dumps(app.openapi())
+    swagger_html = get_swagger_ui_html(
+        openapi_url=_OPENAPI_URL, title=f"{title} - Swagger UI", **swagger_kwargs
+    ).body
+    redoc_html = get_redoc_html(
+        openapi_url=_OPENAPI_URL, title=f"{title} - ReDoc", **redoc_kwargs
+    ).body
+    
+    @app.get(_OPENAPI_URL, include_in_schema=False)
+    async def openapi_schema():
+        return Response(schema_bytes, media_type="application/json")
+    
+    @app.get(_DOCS_URL, include_in_schema=False)
+    async def swagger_ui():
+        return Response(swagger_html, media_type="text/html")
+    
+    @app.get(_REDOC_URL, include_in_schema=False)
+    async def redoc():
+        return Response(redoc_html, media_type="text/html")
+
+
+@functools.lru_cache(maxsize=1)
 def create_application() -> FastAPI:
     """
     Create and configure FastAPI application.
+    
+    Used as the ASGI factory entry point. The application is built once per
+    process; later calls return the same instance.
     """
     # Configure logging
     configure_logging()
     
-    # Create FastAPI app
+    app_name = settings.APP_NAME
+    
+    # Create FastAPI app; API docs are registered by _mount_docs
     app = FastAPI(
-        title=settings.APP_NAME,
-        openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
-        docs_url=f"{settings.API_V1_PREFIX}/docs",
-        redoc_url=f"{settings.API_V1_PREFIX}/redoc",
+        title=app_name,
+        openapi_url=None,
+        docs_url=None,
+        redoc_url=None,
         description="FILMPRO Script Analysis Service API",
         version="0.1.0",
-        debug=settings.DEBUG
+        debug=settings.DEBUG,
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
     )
     
+    # Compress larger responses. Registered before CORS so that CORS is the
+    # outer layer and answers preflights without going through gzip.
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    
     # Add CORS middleware
     app.add_middleware(
-        CORSMiddleware,
+        OriginGatedCORSMiddleware,
         allow_origins=settings.CORS_ORIGINS,
+        allow_origin_regex=settings.CORS_ORIGIN_REGEX,
         allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        allow_methods=_ALLOW_ALL,
+        allow_headers=_ALLOW_ALL,
+        max_age=settings.CORS_MAX_AGE,
     )
     
-    # Register startup and shutdown events
-    app.add_event_handler("startup", lambda: startup_db_client(app))
-    app.add_event_handler("shutdown", lambda: shutdown_db_client(app))
+    # Request timing middleware
+    @app.middleware("http")
+    async def add_process_time_header(request: Request, call_next):
+        # Health checks are polled constantly and their timing isn't useful
+        if request.url.path == _HEALTH_PATH:
+            return await call_next(request)
+        start_time = time.perf_counter_ns()
+        response = await call_next(request)
+        response.headers["X-Process-Time"] = f"{(time.perf_counter_ns() - start_time) / 1e9:.6f}"
+        return response
+    
+    # Health check endpoint
+    health = {"status": "healthy", "version": "0.1.0", "service": app_name}
+    
+    @app.get(_HEALTH_PATH)
+    async def health_check():
+        return health
+    
+    # Include API routers
+    app.include_router(
+        auth.router,
+        prefix=f"{_API_PREFIX}/auth",
+        tags=["authentication"]
+    )
+    
+    app.include_router(
+        scripts.router,
+        prefix=f"{_API_PREFIX}/scripts",
+        tags=["scripts"]
+    )
+    
+    app.include_router(
+        breakdowns.router,
+        prefix=f"{_API_PREFIX}/breakdowns",
+        tags=["breakdowns"]
+    )
+    
+    @app.exception_handler(Exception)
+    async def global_exception_handler(request: Request, exc: Exception):
+        """Global exception handler for unhandled exceptions."""
+        logger.exception(f"Unhandled exception: {str(exc)}")
+        return ORJSONResponse(
+            status_code=500,
+            content={"detail": "An unexpected error occurred"}
+        )
+    
+    # API docs are only served in debug builds
+    if settings.DEBUG:
+        _mount_docs(app)
     
-    return app
\ No newline at end of file
+    return app
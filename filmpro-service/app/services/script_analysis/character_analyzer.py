@@ -1,25 +1,77 @@
 """
 Character analyzer service for analyzing character information, relationships, and arcs.
 """
+import asyncio
+import functools
 import logging
 import re
-from typing import Dict, Any, List, Optional, Tuple, Set
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, NamedTuple, Optional, Pattern, Tuple, Set
 from collections import Counter, defaultdict
-import spacy
 import math
-from itertools import combinations
-
-from app.core.config import settings
+from itertools import chain, combinations
 
 logger = logging.getLogger("filmpro")
 
 
+def _alternation(keywords) -> str:
+    """
+    Build a non-capturing regex alternation matching any of the keywords.
+    
+    Longer keywords come first so multi-word phrases win over their prefixes.
+    
+    Args:
+        keywords: Iterable of literal keywords
+        
+    Returns:
+        Regex source of the form ``(?:kw1|kw2|...)``
+    """
+    return "(?:" + "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + ")"
+
+
+# A sentence body with at least one visible character, then its terminators
+_SENTENCE_RE = re.compile(r'([^.!?]*[^.!?\s][^.!?]*)([.!?]*)')
+_WORD_RE = re.compile(r'\b[a-z]+\b')
+
+
+def _numeric_scene_ids(scene_numbers: List[str]) -> List[int]:
+    """
+    Parse the purely numeric scene numbers to sorted ints.
+    
+    Args:
+        scene_numbers: Scene numbers as strings
+        
+    Returns:
+        Sorted integer scene numbers, skipping non-numeric ones
+    """
+    return sorted(int(s) for s in scene_numbers if s.isdecimal())
+
+
+class _SceneIndex(NamedTuple):
+    """Per-character and per-scene views of a script's scenes, built in one pass."""
+    
+    # Character name -> all of their lowercased dialogue blocks, in script order
+    dialogue_by_char: Dict[str, List[str]]
+    # Scene number -> character name -> their lowercased dialogue blocks in that scene
+    scene_dialogue: Dict[str, Dict[str, List[str]]]
+    # Scene number -> {speaker_a, speaker_b} -> number of consecutive dialogue blocks
+    exchanges_by_scene: Dict[str, Counter]
+    # Scene number -> speaker -> number of dialogue blocks
+    line_counts_by_scene: Dict[str, Counter]
+    # Scene number -> lowercased dialogue and action text of the scene
+    text_by_scene: Dict[str, str]
+    # Scene number -> position of the scene in the script
+    scene_position: Dict[str, int]
+    # (text, lowercased text) of action lines, dialogue blocks and parentheticals
+    # that may mention characters
+    reference_texts: List[Tuple[str, str]]
+
+
 class CharacterAnalyzer:
     """Analyzes characters, their relationships, and dialogue patterns."""
     
     def __init__(self):
         """Initialize the character analyzer."""
-        self.nlp = None
         self.is_initialized = False
         
         # Emotion keywords for character analysis
@@ -71,14 +123,55 @@ class CharacterAnalyzer:
             "antagonistic": {"enemy", "nemesis", "opponent", "rival", "adversary", "foe", "antagonist",
                            "hostile", "hates", "hate", "conflict", "fight", "argue", "arguing"}
         }
+        
+        # Precompiled keyword patterns; all analyzed text is lowercased first.
+        # Emotions share one pattern with a named group per emotion.
+        self._emotion_re = re.compile(
+            r'\b(?:' + "|".join(
+                f"(?P<{emotion}>{_alternation(keywords)})"
+                for emotion, keywords in self.emotion_keywords.items()
+            ) + r')\b'
+        )
+        
+        # Gender, age and relationship indicators share one pattern. Each
+        # indicator maps to the categories it counts towards, e.g. "boy" is
+        # both ("gender", "male") and ("age", "child").
+        indicator_categories = defaultdict(list)
+        for indicator in self.male_indicators:
+            indicator_categories[indicator].append(("gender", "male"))
+        for indicator in self.female_indicators:
+            indicator_categories[indicator].append(("gender", "female"))
+        for age, indicators in self.age_indicators.items():
+            for indicator in indicators:
+                indicator_categories[indicator].append(("age", age))
+        for rel_type, indicators in self.relationship_indicators.items():
+            for indicator in indicators:
+                indicator_categories[indicator].append(("relationship", rel_type))
+        # The scan takes the longest indicator at each position, so a compound
+        # indicator also counts towards the indicators it contains, e.g.
+        # "ex-husband" is romantic through "ex" and male and family through
+        # "husband".
+        self._indicator_categories = {}
+        for indicator, categories in indicator_categories.items():
+            merged = dict.fromkeys(categories)
+            for word in re.split(r'\W+', indicator):
+                if word != indicator:
+                    merged.update(dict.fromkeys(indicator_categories.get(word, ())))
+            self._indicator_categories[indicator] = tuple(merged)
+        self._indicator_re = re.compile(r'\b' + _alternation(self._indicator_categories) + r'\b')
+        
+        # Emotion scores are memoized per text; the same short lines recur
+        # across scenes and characters
+        self._emotion_scores_cache = functools.lru_cache(maxsize=4096)(self._score_emotions)
     
     async def initialize(self):
-        """Load NLP models if not already loaded."""
-        if not self.is_initialized:
-            logger.info(f"Loading spaCy model for character analysis: {settings.SPACY_MODEL}")
-            self.nlp = spacy.load(settings.SPACY_MODEL)
-            self.is_initialized = True
-            logger.info("NLP models loaded successfully for character analysis")
+        """
+        Prepare the analyzer for use.
+        
+        Character analysis is regex based and needs no spaCy model, so there is
+        nothing to load; this is kept for parity with the other analyzers.
+        """
+        self.is_initialized = True
     
     async def analyze_characters(self, parsed_script: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -92,24 +185,34 @@ class CharacterAnalyzer:
         """
         await self.initialize()
         
+        # The analysis is CPU-bound; run it off the event loop
+        return await asyncio.to_thread(self._analyze_characters, parsed_script)
+    
+    def _analyze_characters(self, parsed_script: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze characters in a script synchronously.
+        
+        Args:
+            parsed_script: Dictionary containing parsed script data
+            
+        Returns:
+            Dictionary with character analysis results
+        """
         # Extract characters and scenes
         characters = parsed_script.get("characters", [])
         scenes = parsed_script.get("scenes", [])
+        index = self._index_scenes(scenes)
         
-        # Process each character
-        character_analysis = {}
-        character_arcs = {}
-        gender_predictions = {}
-        age_range_predictions = {}
-        
-        # Scene appearance map for tracking co-occurrences
-        character_scene_map = {}
+        # Whole-word, lowercased name pattern of each character
+        name_res = {
+            character["name"]: re.compile(r'\b' + re.escape(character["name"].lower()) + r'\b')
+            for character in characters
+        }
         
         # Setup data structures
-        for character in characters:
-            char_name = character["name"]
-            character_analysis[char_name] = {
-                "name": char_name,
+        character_analysis = {
+            character["name"]: {
+                "name": character["name"],
                 "dialogue_count": character.get("dialogue_count", 0),
                 "word_count": character.get("word_count", 0),
                 "scenes": character.get("scenes", []),
@@ -118,32 +221,59 @@ class CharacterAnalyzer:
                 "dialogue_style": {},
                 "relationships": {}
             }
-            
-            # Add to character scene map
-            character_scene_map[char_name] = set(character.get("scenes", []))
+            for character in characters
+        }
+        character_arcs = {}
+        gender_predictions = {}
+        age_range_predictions = {}
+        
+        # Scene appearance map for tracking co-occurrences
+        character_scene_map = {
+            character["name"]: set(character.get("scenes", [])) for character in characters
+        }
+        
+        # Numeric scene numbers of each character, parsed once
+        scene_ids_by_char = {
+            character["name"]: _numeric_scene_ids(character.get("scenes", []))
+            for character in characters
+        }
+        
+        # Process each character
+        for character in characters:
+            char_name = character["name"]
             
             # Analyze character dialogue for emotions and style
             if character.get("dialogue_count", 0) > 0:
-                await self._analyze_character_dialogue(characters, scenes, char_name, character_analysis)
+                self._analyze_character_dialogue(
+                    char_name, index.dialogue_by_char.get(char_name, []), character_analysis
+                )
+            
+            # Indicators near the character's name, shared by gender and age prediction
+            mention_counts = self._count_mention_indicators(
+                [text_lower for text, text_lower in index.reference_texts if char_name in text],
+                name_res[char_name]
+            )
             
             # Predict gender based on context
-            gender_predictions[char_name] = await self._predict_character_gender(character, scenes)
+            gender_predictions[char_name] = self._predict_character_gender(mention_counts)
             
             # Predict age range based on context
-            age_range_predictions[char_name] = await self._predict_character_age(character, scenes)
+            age_range_predictions[char_name] = self._predict_character_age(mention_counts)
             
             # Track character arcs
-            character_arcs[char_name] = await self._analyze_character_arc(character, scenes)
+            character_arcs[char_name] = self._analyze_character_arc(
+                character, scene_ids_by_char[char_name], index
+            )
         
         # Calculate importance scores based on various factors
         for char_name, analysis in character_analysis.items():
             analysis["importance_score"] = self._calculate_character_importance(
-                analysis, len(scenes), len(characters)
+                analysis, scene_ids_by_char[char_name], len(scenes), len(characters)
             )
         
         # Analyze character relationships
-        relationship_matrix = await self._analyze_character_relationships(
-            characters, scenes, character_scene_map
+        relationship_matrix = self._analyze_character_relationships(
+            characters, index, character_scene_map, name_res
         )
         
         # Add relationship data to character analysis
@@ -162,26 +292,79 @@ class CharacterAnalyzer:
             "relationship_matrix": relationship_matrix
         }
     
-    async def _analyze_character_dialogue(self, characters: List[Dict[str, Any]], 
-                                       scenes: List[Dict[str, Any]], 
-                                       character_name: str,
-                                       character_analysis: Dict[str, Dict[str, Any]]):
+    def _index_scenes(self, scenes: List[Dict[str, Any]]) -> _SceneIndex:
         """
-        Analyze a character's dialogue for emotions and speech patterns.
+        Build the dialogue and text lookups used by the analysis in one pass.
+        
+        Every text is lowercased here, once, for the case-insensitive analysis.
         
         Args:
-            characters: List of character dictionaries
             scenes: List of scene dictionaries
-            character_name: Name of the character to analyze
-            character_analysis: Dictionary to store analysis results
+            
+        Returns:
+            Scene index
         """
-        # Collect all dialogue for this character
-        all_dialogue = []
-        for scene in scenes:
+        dialogue_by_char = defaultdict(list)
+        scene_dialogue = {}
+        exchanges_by_scene = {}
+        line_counts_by_scene = {}
+        text_by_scene = {}
+        scene_position = {}
+        reference_texts = []
+        
+        for position, scene in enumerate(scenes):
+            scene_number = scene.get("scene_number")
+            scene_position.setdefault(scene_number, position)
+            char_lines = scene_dialogue.setdefault(scene_number, defaultdict(list))
+            speakers = []
+            actions = [(action, action.lower()) for action in scene.get("action", [])]
+            reference_texts.extend(actions)
+            
+            scene_lines = []
             for dialogue in scene.get("dialogue", []):
-                if dialogue.get("character") == character_name:
-                    all_dialogue.extend(dialogue.get("lines", []))
+                speaker = dialogue.get("character")
+                lines = dialogue.get("lines", [])
+                speakers.append(speaker)
+                block = " ".join(lines)
+                block_lower = block.lower()
+                if lines:
+                    dialogue_by_char[speaker].append(block_lower)
+                    char_lines[speaker].append(block_lower)
+                    scene_lines.append(block_lower)
+                reference_texts.append((block, block_lower))
+                reference_texts.extend(
+                    (parenthetical, parenthetical.lower())
+                    for parenthetical in dialogue.get("parentheticals", [])
+                )
+            
+            # Count adjacent speaker pairs and dialogue blocks per speaker
+            exchanges_by_scene.setdefault(scene_number, Counter()).update(
+                map(frozenset, zip(speakers, speakers[1:]))
+            )
+            line_counts_by_scene.setdefault(scene_number, Counter()).update(speakers)
+            
+            scene_lines.extend(action_lower for _, action_lower in actions)
+            if scene_lines:
+                scene_text = " ".join(scene_lines)
+                previous = text_by_scene.get(scene_number)
+                text_by_scene[scene_number] = f"{previous} {scene_text}" if previous else scene_text
         
+        return _SceneIndex(
+            dialogue_by_char, scene_dialogue, exchanges_by_scene, line_counts_by_scene,
+            text_by_scene, scene_position, reference_texts
+        )
+    
+    def _analyze_character_dialogue(self, character_name: str,
+                                 all_dialogue: List[str],
+                                 character_analysis: Dict[str, Dict[str, Any]]):
+        """
+        Analyze a character's dialogue for emotions and speech patterns.
+        
+        Args:
+            character_name: Name of the character to analyze
+            all_dialogue: All of the character's lowercased dialogue blocks
+            character_analysis: Dictionary to store analysis results
+        """
         if not all_dialogue:
             return
         
@@ -189,104 +372,111 @@ class CharacterAnalyzer:
         full_dialogue = " ".join(all_dialogue)
         
         # Analyze dialogue for emotions
-        emotion_counts = {}
-        for emotion, keywords in self.emotion_keywords.items():
-            count = 0
-            for keyword in keywords:
-                count += len(re.findall(r'\b' + re.escape(keyword) + r'\b', full_dialogue.lower()))
-            if count > 0:
-                emotion_counts[emotion] = count
+        emotion_counts = self._count_emotions(full_dialogue)
         
         # Normalize to get emotion scores (0-1 range)
         total_emotions = sum(emotion_counts.values()) if emotion_counts else 1
         emotion_scores = {emotion: count / total_emotions for emotion, count in emotion_counts.items()}
         
         # Analyze dialogue style
-        dialogue_style = {
-            "avg_sentence_length": self._calculate_avg_sentence_length(full_dialogue),
-            "vocabulary_richness": self._calculate_vocabulary_richness(full_dialogue),
-            "question_frequency": self._calculate_question_frequency(full_dialogue),
-            "exclamation_frequency": self._calculate_exclamation_frequency(full_dialogue)
-        }
+        dialogue_style = self._calculate_dialogue_style(full_dialogue)
         
         # Update character analysis
         character_analysis[character_name]["emotions"] = emotion_scores
         character_analysis[character_name]["dialogue_style"] = dialogue_style
     
-    async def _analyze_character_relationships(self, 
-                                            characters: List[Dict[str, Any]],
-                                            scenes: List[Dict[str, Any]],
-                                            character_scene_map: Dict[str, Set[str]]) -> Dict[str, Dict[str, Any]]:
+    def _analyze_character_relationships(self, 
+                                      characters: List[Dict[str, Any]],
+                                      index: _SceneIndex,
+                                      character_scene_map: Dict[str, Set[str]],
+                                      name_res: Dict[str, Pattern]) -> Dict[str, Dict[str, Any]]:
         """
         Analyze relationships between characters based on scene co-occurrence and dialogue.
         
         Args:
             characters: List of character dictionaries
-            scenes: List of scene dictionaries
+            index: Scene index
             character_scene_map: Mapping of characters to the scenes they appear in
+            name_res: Compiled name pattern of each character
             
         Returns:
             Dictionary of character relationships
         """
         # Initialize relationship matrix
-        relationship_matrix = defaultdict(dict)
-        
-        # Calculate co-occurrence strength
-        for char1, char2 in combinations(character_scene_map.keys(), 2):
-            # Skip if either character has no scenes
-            if not character_scene_map[char1] or not character_scene_map[char2]:
-                continue
-                
-            # Calculate overlap in scenes
-            shared_scenes = character_scene_map[char1].intersection(character_scene_map[char2])
+        relationship_matrix = {char_name: {} for char_name in character_scene_map}
+        relationships = []
+        
+        # Characters appearing in each scene, by position in character_scene_map
+        char_names = list(character_scene_map)
+        scene_casts = defaultdict(list)
+        for i, char_name in enumerate(char_names):
+            for scene_number in character_scene_map[char_name]:
+                scene_casts[scene_number].append(i)
+        
+        # Shared scenes of every pair that appears together at least once;
+        # pairs that never share a scene are never visited
+        pair_scenes = defaultdict(list)
+        for scene_number, cast in scene_casts.items():
+            for pair in combinations(cast, 2):
+                pair_scenes[pair].append(scene_number)
+        
+        # Calculate co-occurrence strength, in character order
+        for i, j in sorted(pair_scenes):
+            char1, char2 = char_names[i], char_names[j]
+            shared_scenes = pair_scenes[(i, j)]
+            shared_count = len(shared_scenes)
             
-            if not shared_scenes:
-                continue
-                
             # Calculate co-occurrence score (Jaccard similarity)
-            union_scenes = character_scene_map[char1].union(character_scene_map[char2])
-            co_occurrence = len(shared_scenes) / len(union_scenes)
+            union_count = len(character_scene_map[char1]) + len(character_scene_map[char2]) - shared_count
+            co_occurrence = shared_count / union_count
             
             # Calculate dialogue interaction score
-            dialogue_interaction = await self._calculate_dialogue_interaction(char1, char2, scenes, shared_scenes)
+            dialogue_interaction = self._calculate_dialogue_interaction(
+                char1, char2, index, shared_scenes
+            )
             
             # Determine relationship type
-            relationship_type = await self._detect_relationship_type(char1, char2, scenes, shared_scenes)
+            relationship_type = self._detect_relationship_type(
+                name_res[char1], name_res[char2], index, shared_scenes
+            )
             
             # Combined relationship strength (co-occurrence + dialogue interaction)
             relationship_strength = 0.7 * co_occurrence + 0.3 * dialogue_interaction
             
-            # Store relationship data
-            relationship_matrix[char1][char2] = {
-                "strength": round(relationship_strength, 2),
-                "co_occurrence": round(co_occurrence, 2),
-                "dialogue_interaction": round(dialogue_interaction, 2),
-                "shared_scenes": list(shared_scenes),
-                "relationship_type": relationship_type
-            }
-            
-            # Mirror the relationship (symmetric)
-            relationship_matrix[char2][char1] = {
-                "strength": round(relationship_strength, 2),
-                "co_occurrence": round(co_occurrence, 2),
-                "dialogue_interaction": round(dialogue_interaction, 2),
-                "shared_scenes": list(shared_scenes),
+            # Store relationship data; the relationship is symmetric, so both
+            # directions share the same (read-only) entry
+            relationship = {
+                "strength": relationship_strength,
+                "co_occurrence": co_occurrence,
+                "dialogue_interaction": dialogue_interaction,
+                "shared_scenes": shared_scenes,
                 "relationship_type": relationship_type
             }
-        
-        return dict(relationship_matrix)
+            relationship_matrix[char1][char2] = relationship
+            relationship_matrix[char2][char1] = relationship
+            relationships.append(relationship)
+        
+        # Scores are kept at full precision while pairs are scored and rounded
+        # once for output
+        for relationship in relationships:
+            relationship["strength"] = round(relationship["strength"], 2)
+            relationship["co_occurrence"] = round(relationship["co_occurrence"], 2)
+            relationship["dialogue_interaction"] = round(relationship["dialogue_interaction"], 2)
+        
+        # Only characters with at least one relationship are reported
+        return {char_name: relationships for char_name, relationships in relationship_matrix.items() if relationships}
     
-    async def _calculate_dialogue_interaction(self, char1: str, char2: str, 
-                                           scenes: List[Dict[str, Any]], 
-                                           shared_scenes: Set[str]) -> float:
+    def _calculate_dialogue_interaction(self, char1: str, char2: str, 
+                                     index: _SceneIndex, 
+                                     shared_scenes: List[str]) -> float:
         """
         Calculate how much two characters interact through dialogue.
         
         Args:
             char1: First character name
             char2: Second character name
-            scenes: List of scene dictionaries
-            shared_scenes: Set of scene numbers where both characters appear
+            index: Scene index
+            shared_scenes: Scene numbers where both characters appear
             
         Returns:
             Dialogue interaction score (0-1)
@@ -294,33 +484,22 @@ class CharacterAnalyzer:
         # Count dialogue exchanges between characters
         interaction_count = 0
         max_possible_interactions = 0
+        pair = frozenset((char1, char2))
         
-        for scene in scenes:
-            if scene.get("scene_number") not in shared_scenes:
+        for scene_number in shared_scenes:
+            line_counts = index.line_counts_by_scene.get(scene_number)
+            if not line_counts:
                 continue
-                
-            # Extract dialogue in order
-            scene_dialogue = scene.get("dialogue", [])
-            if len(scene_dialogue) <= 1:
-                continue
-                
-            # Count consecutive dialogue between char1 and char2
-            for i in range(len(scene_dialogue) - 1):
-                speaker1 = scene_dialogue[i].get("character")
-                speaker2 = scene_dialogue[i + 1].get("character")
-                
-                if (speaker1 == char1 and speaker2 == char2) or (speaker1 == char2 and speaker2 == char1):
-                    interaction_count += 1
+            
+            # Consecutive dialogue between char1 and char2
+            interaction_count += index.exchanges_by_scene[scene_number][pair]
             
             # Count total possible interactions in this scene
-            char1_speaks = any(d.get("character") == char1 for d in scene_dialogue)
-            char2_speaks = any(d.get("character") == char2 for d in scene_dialogue)
+            char1_lines = line_counts[char1]
+            char2_lines = line_counts[char2]
             
-            if char1_speaks and char2_speaks:
-                max_possible_interactions += min(
-                    sum(1 for d in scene_dialogue if d.get("character") == char1),
-                    sum(1 for d in scene_dialogue if d.get("character") == char2)
-                )
+            if char1_lines and char2_lines:
+                max_possible_interactions += min(char1_lines, char2_lines)
         
         # Calculate interaction score
         if max_possible_interactions == 0:
@@ -328,56 +507,41 @@ class CharacterAnalyzer:
             
         return interaction_count / max_possible_interactions
     
-    async def _detect_relationship_type(self, char1: str, char2: str, 
-                                     scenes: List[Dict[str, Any]], 
-                                     shared_scenes: Set[str]) -> str:
+    def _detect_relationship_type(self, char1_re: Pattern, char2_re: Pattern, 
+                               index: _SceneIndex, 
+                               shared_scenes: List[str]) -> str:
         """
         Detect the type of relationship between two characters.
         
         Args:
-            char1: First character name
-            char2: Second character name
-            scenes: List of scene dictionaries
-            shared_scenes: Set of scene numbers where both characters appear
+            char1_re: Name pattern of the first character
+            char2_re: Name pattern of the second character
+            index: Scene index
+            shared_scenes: Scene numbers where both characters appear
             
         Returns:
             Relationship type
         """
-        # Collect all dialogue and action lines from shared scenes
-        scene_texts = []
+        # Join the dialogue and action text of shared scenes, in script order
+        text_by_scene = index.text_by_scene
+        scene_numbers = sorted(
+            (scene_number for scene_number in shared_scenes if scene_number in text_by_scene),
+            key=index.scene_position.__getitem__
+        )
+        full_text = " ".join(text_by_scene[scene_number] for scene_number in scene_numbers)
         
-        for scene in scenes:
-            if scene.get("scene_number") not in shared_scenes:
-                continue
-                
-            # Get dialogue
-            for dialogue in scene.get("dialogue", []):
-                scene_texts.extend(dialogue.get("lines", []))
-            
-            # Get action lines
-            scene_texts.extend(scene.get("action", []))
+        # Check for relationship indicators
+        indicator_hits = self._find_indicators(full_text)
         
-        # Join all text for analysis
-        full_text = " ".join(scene_texts).lower()
+        # Indicators near character names, plus all indicators in text at a lower weight
+        near_counts = self._count_near(char1_re, full_text, indicator_hits)
+        near_counts.update(self._count_near(char2_re, full_text, indicator_hits))
+        direct_counts = Counter(chain.from_iterable(indicator_hits[2]))
         
-        # Check for relationship indicators
         type_scores = {}
-        for rel_type, indicators in self.relationship_indicators.items():
-            count = 0
-            for indicator in indicators:
-                # Check for indicator near character names
-                char1_pattern = r'\b' + re.escape(char1.lower()) + r'.{0,30}' + re.escape(indicator) + r'\b'
-                char2_pattern = r'\b' + re.escape(char2.lower()) + r'.{0,30}' + re.escape(indicator) + r'\b'
-                inv_char1_pattern = r'\b' + re.escape(indicator) + r'.{0,30}' + re.escape(char1.lower()) + r'\b'
-                inv_char2_pattern = r'\b' + re.escape(indicator) + r'.{0,30}' + re.escape(char2.lower()) + r'\b'
-                
-                count += len(re.findall(char1_pattern, full_text))
-                count += len(re.findall(char2_pattern, full_text))
-                count += len(re.findall(inv_char1_pattern, full_text))
-                count += len(re.findall(inv_char2_pattern, full_text))
-                
-                # Also check for direct indicator in text
-                count += len(re.findall(r'\b' + re.escape(indicator) + r'\b', full_text)) * 0.2  # Lower weight
+        for rel_type in self.relationship_indicators:
+            key = ("relationship", rel_type)
+            count = near_counts[key] + direct_counts[key] * 0.2
             
             if count > 0:
                 type_scores[rel_type] = count
@@ -388,13 +552,14 @@ class CharacterAnalyzer:
             
         return max(type_scores.items(), key=lambda x: x[1])[0]
     
-    def _calculate_character_importance(self, character_data: Dict[str, Any], 
+    def _calculate_character_importance(self, character_data: Dict[str, Any], scene_ids: List[int],
                                       total_scenes: int, total_characters: int) -> float:
         """
         Calculate a character's importance score based on various metrics.
         
         Args:
             character_data: Character analysis data
+            scene_ids: Sorted numeric scene numbers of the character
             total_scenes: Total number of scenes in the script
             total_characters: Total number of characters in the script
             
@@ -423,14 +588,9 @@ class CharacterAnalyzer:
         relationship_centrality = relationship_count / (total_characters - 1) if total_characters > 1 else 0
         
         # Calculate name prominence (inverse of first appearance)
-        scenes = character_data.get("scenes", [])
-        if scenes:
-            # Convert scene numbers to integers if possible
-            try:
-                first_scene = min(int(s) if s.isdigit() else float('inf') for s in scenes)
-                name_prominence = max(1 - (first_scene / (total_scenes * 2)), 0)  # Earlier is better
-            except ValueError:
-                name_prominence = 0.5  # Default if scene numbers aren't numeric
+        if scene_ids:
+            first_scene = scene_ids[0]
+            name_prominence = max(1 - (first_scene / (total_scenes * 2)), 0)  # Earlier is better
         else:
             name_prominence = 0
         
@@ -445,64 +605,41 @@ class CharacterAnalyzer:
         # Ensure it's in 0-1 range and round to 2 decimals
         return round(min(max(importance, 0.0), 1.0), 2)
     
-    async def _predict_character_gender(self, character: Dict[str, Any], 
-                                     scenes: List[Dict[str, Any]]) -> Optional[str]:
+    def _count_mention_indicators(self, references: List[str], name_re: Pattern) -> Optional[Counter]:
         """
-        Predict a character's gender based on dialogue and references.
+        Count indicator categories near a character's name in text mentioning them.
         
         Args:
-            character: Character dictionary
-            scenes: List of scene dictionaries
+            references: Lowercased action, dialogue and parenthetical text mentioning the character
+            name_re: Compiled name pattern of the character
             
         Returns:
-            Predicted gender or None if undetermined
+            Counter of indicator categories, or None if the character is never mentioned
         """
-        char_name = character["name"]
-        
-        # Collect all text where this character is mentioned
-        references = []
-        
-        for scene in scenes:
-            # Check action lines for mentions
-            for action in scene.get("action", []):
-                if char_name in action:
-                    references.append(action)
-            
-            # Check dialogue for mentions
-            for dialogue in scene.get("dialogue", []):
-                if char_name in " ".join(dialogue.get("lines", [])):
-                    references.append(" ".join(dialogue.get("lines", [])))
-                    
-                # Also check parentheticals
-                for parenthetical in dialogue.get("parentheticals", []):
-                    if char_name in parenthetical:
-                        references.append(parenthetical)
-        
         if not references:
             return None
             
         # Join all references for analysis
-        full_text = " ".join(references).lower()
+        full_text = " ".join(references)
         
-        # Count gender indicators
-        male_count = 0
-        female_count = 0
+        return self._count_near(name_re, full_text, self._find_indicators(full_text))
+    
+    def _predict_character_gender(self, mention_counts: Optional[Counter]) -> Optional[str]:
+        """
+        Predict a character's gender based on dialogue and references.
         
-        for indicator in self.male_indicators:
-            # Look for indicators near character name
-            pattern = r'\b' + re.escape(char_name.lower()) + r'.{0,30}' + re.escape(indicator) + r'\b'
-            inv_pattern = r'\b' + re.escape(indicator) + r'.{0,30}' + re.escape(char_name.lower()) + r'\b'
+        Args:
+            mention_counts: Indicator categories near the character's name, or None
             
-            male_count += len(re.findall(pattern, full_text))
-            male_count += len(re.findall(inv_pattern, full_text))
+        Returns:
+            Predicted gender or None if undetermined
+        """
+        if mention_counts is None:
+            return None
         
-        for indicator in self.female_indicators:
-            # Look for indicators near character name
-            pattern = r'\b' + re.escape(char_name.lower()) + r'.{0,30}' + re.escape(indicator) + r'\b'
-            inv_pattern = r'\b' + re.escape(indicator) + r'.{0,30}' + re.escape(char_name.lower()) + r'\b'
-            
-            female_count += len(re.findall(pattern, full_text))
-            female_count += len(re.findall(inv_pattern, full_text))
+        # Count gender indicators near character name
+        male_count = mention_counts[("gender", "male")]
+        female_count = mention_counts[("gender", "female")]
         
         # Determine gender based on counts
         if male_count > female_count:
@@ -512,56 +649,21 @@ class CharacterAnalyzer:
         else:
             return None  # Undetermined
     
-    async def _predict_character_age(self, character: Dict[str, Any], 
-                                  scenes: List[Dict[str, Any]]) -> Optional[str]:
+    def _predict_character_age(self, mention_counts: Optional[Counter]) -> Optional[str]:
         """
         Predict a character's age range based on dialogue and references.
         
         Args:
-            character: Character dictionary
-            scenes: List of scene dictionaries
+            mention_counts: Indicator categories near the character's name, or None
             
         Returns:
             Predicted age range or None if undetermined
         """
-        char_name = character["name"]
-        
-        # Collect all text where this character is mentioned
-        references = []
-        
-        for scene in scenes:
-            # Check action lines for mentions
-            for action in scene.get("action", []):
-                if char_name in action:
-                    references.append(action)
-            
-            # Check dialogue for mentions
-            for dialogue in scene.get("dialogue", []):
-                if char_name in " ".join(dialogue.get("lines", [])):
-                    references.append(" ".join(dialogue.get("lines", [])))
-                    
-                # Also check parentheticals
-                for parenthetical in dialogue.get("parentheticals", []):
-                    if char_name in parenthetical:
-                        references.append(parenthetical)
-        
-        if not references:
+        if mention_counts is None:
             return None
-            
-        # Join all references for analysis
-        full_text = " ".join(references).lower()
-        
-        # Count age indicators
-        age_counts = {age: 0 for age in self.age_indicators}
         
-        for age, indicators in self.age_indicators.items():
-            for indicator in indicators:
-                # Look for indicators near character name
-                pattern = r'\b' + re.escape(char_name.lower()) + r'.{0,30}' + re.escape(indicator) + r'\b'
-                inv_pattern = r'\b' + re.escape(indicator) + r'.{0,30}' + re.escape(char_name.lower()) + r'\b'
-                
-                age_counts[age] += len(re.findall(pattern, full_text))
-                age_counts[age] += len(re.findall(inv_pattern, full_text))
+        # Count age indicators near character name
+        age_counts = {age: mention_counts[("age", age)] for age in self.age_indicators}
         
         # Determine age based on counts
         if sum(age_counts.values()) == 0:
@@ -570,14 +672,15 @@ class CharacterAnalyzer:
         # Get age with highest count
         return max(age_counts.items(), key=lambda x: x[1])[0]
     
-    async def _analyze_character_arc(self, character: Dict[str, Any], 
-                                   scenes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_character_arc(self, character: Dict[str, Any], numeric_scene_ids: List[int],
+                             index: _SceneIndex) -> Dict[str, Any]:
         """
         Analyze a character's arc through the script.
         
         Args:
             character: Character dictionary
-            scenes: List of scene dictionaries
+            numeric_scene_ids: Sorted numeric scene numbers of the character
+            index: Scene index
             
         Returns:
             Dictionary with character arc information
@@ -588,13 +691,13 @@ class CharacterAnalyzer:
         if not char_scenes:
             return {"has_arc": False}
         
-        try:
-            # Convert scene numbers to integers for proper ordering
-            # Note: This assumes scene numbers are numeric strings
-            scene_ids = [int(s) if s.isdigit() else s for s in char_scenes]
-            scene_ids.sort()
-        except (ValueError, TypeError):
-            # If scene numbers aren't all numeric, use original order
+        if len(numeric_scene_ids) == len(char_scenes):
+            # Numeric scene numbers are ordered as integers
+            scene_ids = numeric_scene_ids
+        elif not numeric_scene_ids:
+            scene_ids = sorted(char_scenes)
+        else:
+            # If scene numbers are only partly numeric, use original order
             scene_ids = char_scenes
         
         # Map emotions across scenes
@@ -603,16 +706,9 @@ class CharacterAnalyzer:
         for scene_id in scene_ids:
             scene_id_str = str(scene_id)
             
-            # Find corresponding scene
-            scene = next((s for s in scenes if s.get("scene_number") == scene_id_str), None)
-            if not scene:
-                continue
-                
             # Get character's dialogue in this scene
-            char_dialogue = []
-            for dialogue in scene.get("dialogue", []):
-                if dialogue.get("character") == char_name:
-                    char_dialogue.extend(dialogue.get("lines", []))
+            scene_dialogue = index.scene_dialogue.get(scene_id_str)
+            char_dialogue = scene_dialogue.get(char_name) if scene_dialogue else None
             
             # Skip scenes without dialogue
             if not char_dialogue:
@@ -620,7 +716,7 @@ class CharacterAnalyzer:
                 
             # Analyze emotions in dialogue
             text = " ".join(char_dialogue)
-            emotion_scores = await self._get_emotion_scores(text)
+            emotion_scores = self._get_emotion_scores(text)
             
             # Add to progression with scene number
             emotion_progression.append({
@@ -641,25 +737,29 @@ class CharacterAnalyzer:
             "arc_description": self._generate_arc_description(emotional_changes) if has_arc else None
         }
     
-    async def _get_emotion_scores(self, text: str) -> Dict[str, float]:
+    def _get_emotion_scores(self, text: str) -> Dict[str, float]:
         """
         Get emotion scores for a text.
         
         Args:
-            text: Text to analyze
+            text: Lowercased text to analyze
             
         Returns:
             Dictionary of emotion scores
         """
-        text = text.lower()
-        emotion_counts = {}
+        return dict(self._emotion_scores_cache(text))
+    
+    def _score_emotions(self, text: str) -> Dict[str, float]:
+        """
+        Compute emotion scores for a text; use the cached _get_emotion_scores.
         
-        for emotion, keywords in self.emotion_keywords.items():
-            count = 0
-            for keyword in keywords:
-                count += len(re.findall(r'\b' + re.escape(keyword) + r'\b', text))
-            if count > 0:
-                emotion_counts[emotion] = count
+        Args:
+            text: Lowercased text to analyze
+            
+        Returns:
+            Dictionary of emotion scores
+        """
+        emotion_counts = self._count_emotions(text)
         
         # Normalize to get emotion scores (0-1 range)
         total_emotions = sum(emotion_counts.values()) if emotion_counts else 1
@@ -671,6 +771,64 @@ class CharacterAnalyzer:
             
         return emotion_scores
     
+    def _count_emotions(self, text: str) -> Dict[str, int]:
+        """
+        Count emotion keyword hits in a lowercased text with a single scan.
+        
+        Args:
+            text: Lowercased text to analyze
+            
+        Returns:
+            Dictionary of emotion counts, in emotion_keywords order, without zeros
+        """
+        counts = Counter(m.lastgroup for m in self._emotion_re.finditer(text))
+        return {emotion: counts[emotion] for emotion in self.emotion_keywords if counts[emotion]}
+    
+    def _find_indicators(self, text: str) -> Tuple[List[int], List[int], List[Tuple[Tuple[str, str], ...]]]:
+        """
+        Locate all gender, age and relationship indicators in one scan.
+        
+        Args:
+            text: Lowercased text to search
+            
+        Returns:
+            Sorted start offsets, end offsets and categories of each indicator hit
+        """
+        starts, ends, categories = [], [], []
+        for match in self._indicator_re.finditer(text):
+            starts.append(match.start())
+            ends.append(match.end())
+            categories.append(self._indicator_categories[match.group()])
+        return starts, ends, categories
+    
+    def _count_near(self, name_re: Pattern, text: str,
+                    indicator_hits: Tuple[List[int], List[int], List[Tuple[Tuple[str, str], ...]]]) -> Counter:
+        """
+        Count indicator categories within 30 characters before or after a name.
+        
+        Args:
+            name_re: Compiled name pattern
+            text: Lowercased text to search
+            indicator_hits: Result of _find_indicators for the same text
+            
+        Returns:
+            Counter of indicator categories
+        """
+        starts, ends, categories = indicator_hits
+        counts = Counter()
+        if not starts:
+            return counts
+        
+        for match in name_re.finditer(text):
+            name_start, name_end = match.span()
+            # Indicators starting up to 30 characters after the name...
+            after = range(bisect_left(starts, name_end), bisect_right(starts, name_end + 30))
+            # ...and ending up to 30 characters before it
+            before = range(bisect_left(ends, name_start - 30), bisect_right(ends, name_start))
+            for i in chain(after, before):
+                counts.update(categories[i])
+        return counts
+    
     def _analyze_emotional_changes(self, emotion_progression: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Analyze emotional changes throughout a character's scenes.
@@ -684,30 +842,24 @@ class CharacterAnalyzer:
         if len(emotion_progression) < 2:
             return []
             
-        changes = []
-        prev_dominant = None
-        
+        # Dominant emotion of each scene that has any
+        dominants = []
         for i, scene_emotions in enumerate(emotion_progression):
-            emotions = scene_emotions.get("emotions", {})
-            
-            if not emotions:
-                continue
-                
-            # Get dominant emotion
-            dominant = max(emotions.items(), key=lambda x: x[1])[0] if emotions else "neutral"
-            
-            # Check if dominant emotion changed
-            if prev_dominant is not None and dominant != prev_dominant:
-                changes.append({
-                    "from_scene": emotion_progression[i-1]["scene"],
-                    "to_scene": scene_emotions["scene"],
-                    "from_emotion": prev_dominant,
-                    "to_emotion": dominant
-                })
-                
-            prev_dominant = dominant
-            
-        return changes
+            emotions = scene_emotions.get("emotions")
+            if emotions:
+                dominants.append((i, max(emotions, key=emotions.get)))
+        
+        # Record every scene where the dominant emotion differs from the previous one
+        return [
+            {
+                "from_scene": emotion_progression[i - 1]["scene"],
+                "to_scene": emotion_progression[i]["scene"],
+                "from_emotion": prev_dominant,
+                "to_emotion": dominant
+            }
+            for (_, prev_dominant), (i, dominant) in zip(dominants, dominants[1:])
+            if dominant != prev_dominant
+        ]
     
     def _generate_arc_description(self, emotional_changes: List[Dict[str, Any]]) -> str:
         """
@@ -744,45 +896,36 @@ class CharacterAnalyzer:
             else:
                 return f"Character undergoes {transition_count} significant emotional changes."
     
-    def _calculate_avg_sentence_length(self, text: str) -> float:
-        """Calculate average sentence length in words."""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        if not sentences:
-            return 0.0
-            
-        word_counts = [len(s.split()) for s in sentences]
-        return round(sum(word_counts) / len(sentences), 1)
-    
-    def _calculate_vocabulary_richness(self, text: str) -> float:
-        """Calculate vocabulary richness (unique words / total words)."""
-        words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-        
-        if not words:
-            return 0.0
-            
-        unique_words = set(words)
-        return round(len(unique_words) / len(words), 2)
-    
-    def _calculate_question_frequency(self, text: str) -> float:
-        """Calculate frequency of questions (sentences ending with ?)."""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        if not sentences:
-            return 0.0
-            
-        question_count = sum(1 for s in sentences if s.endswith('?'))
-        return round(question_count / len(sentences), 2)
-    
-    def _calculate_exclamation_frequency(self, text: str) -> float:
-        """Calculate frequency of exclamations (sentences ending with !)."""
-        sentences = re.split(r'[.!?]+', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+    def _calculate_dialogue_style(self, text: str) -> Dict[str, float]:
+        """
+        Calculate speech pattern metrics of dialogue from one sentence split.
         
-        if not sentences:
-            return 0.0
+        Args:
+            text: Lowercased dialogue text
             
-        exclamation_count = sum(1 for s in sentences if s.endswith('!'))
-        return round(exclamation_count / len(sentences), 2)
\ No newline at end of file
+        Returns:
+            Dictionary with average sentence length (in words), vocabulary
+            richness (unique words / total words) and question and
+            exclamation frequencies
+        """
+        # Each sentence keeps its terminators, so questions and exclamations can be told apart
+        sentences = _SENTENCE_RE.findall(text)
+        words = _WORD_RE.findall(text)
+        
+        word_total = 0
+        question_count = 0
+        exclamation_count = 0
+        for body, terminators in sentences:
+            word_total += len(body.split())
+            if terminators.endswith('?'):
+                question_count += 1
+            elif terminators.endswith('!'):
+                exclamation_count += 1
+        
+        sentence_count = len(sentences)
+        return {
+            "avg_sentence_length": round(word_total / sentence_count, 1) if sentences else 0.0,
+            "vocabulary_richness": round(len(set(words)) / len(words), 2) if words else 0.0,
+            "question_frequency": round(question_count / sentence_count, 2) if sentences else 0.0,
+            "exclamation_frequency": round(exclamation_count / sentence_count, 2) if sentences else 0.0
+        }
\ No newline at end of file
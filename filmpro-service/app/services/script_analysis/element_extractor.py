@@ -1,40 +1,164 @@
 """
 Service for extracting elements from script content using NLP.
 """
-import spacy
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Set, Tuple
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, NamedTuple, Set, Tuple
 import re
-from collections import Counter
+import threading
+from collections import Counter, OrderedDict, defaultdict
+
+from spacy.tokens import Doc
 
 from app.core.config import settings
 from app.models.script import ElementType
+from app.utils.nlp import load_nlp, pipeline_lock
 
 logger = logging.getLogger("filmpro")
 
 
+# Pipeline components the extractor never uses; the attribute ruler stays
+# because it sets token.pos_ in the English pipelines
+_DISABLED_PIPES = ["lemmatizer", "textcat"]
+
+# A capitalized word inside a sentence, i.e. a possible PRODUCT, WORK_OF_ART
+# or ORG entity; capitals after a sentence or line start don't count
+_ENTITY_CANDIDATE_RE = re.compile(r"(?<![.!?\n])(?<![.!?]\s)(?<!^)\b[A-Z][a-z]+")
+
+# Serialized Docs of recently parsed action texts, keyed by text digest
+_DOC_CACHE_MAX_SIZE = 32
+
+
+class _SceneSpans(NamedTuple):
+    """Offsets of each scene's action section in the combined action text, in order."""
+    
+    starts: List[int]
+    ends: List[int]
+    scene_numbers: List[str]
+
+
 class ElementExtractor:
     """Extract elements from script content using NLP."""
     
     def __init__(self):
         """Initialize the element extractor with NLP models."""
         self.nlp = None
+        self._nlp_lock = pipeline_lock(settings.SPACY_MODEL)
         self.is_initialized = False
+        self._doc_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+        # Extractions run in worker threads and share the Doc cache
+        self._doc_cache_lock = threading.Lock()
         self.prop_patterns = [
             r"\b(?:holding|carries|carrying|using|with|puts? down|picks? up|hands|handed|giving|gave|takes?|taking|took|pulls? out|bringing|brings?|brought|wears?|wearing|wore|dressed in|dressed with)\s+(?:a|an|the|his|her|their)?\s*([A-Z][a-z]+(?:\s+[a-z]+){0,3})",
             r"\b(?:a|an|the)\s+([A-Z][a-z]+(?:\s+[a-z]+){0,3})\s+(?:sits|rests|lies|lying|placed|is placed|on|beside|next to|above|below|under|behind|in front of)",
         ]
         self.vehicle_keywords = {"car", "truck", "bus", "motorcycle", "bike", "bicycle", "SUV", "van", "taxi", "boat", "ship", "plane", "helicopter", "jet", "train"}
         self.prop_stop_words = {"man", "woman", "boy", "girl", "person", "friend", "mother", "father", "child", "children", "people", "group", "crowd", "audience", "everyone", "anybody", "somebody", "man's", "woman's", "guy", "guys"}
+        self.garment_keywords = ["jacket", "shirt", "dress", "suit", "pants", "skirt", "hat", "coat", "sweater", "blouse", "shoes", "boots", "uniform", "costume", "outfit"]
+        garments = "|".join(self.garment_keywords)
+        self.wardrobe_patterns = [
+            rf"(?:wearing|wears|dressed in|dressed with|puts on|wearing a|wearing an|in a|in an)\s+([A-Za-z]+(?:\s+[A-Za-z]+){{0,3}}?)\s+(?:{garments})",
+            rf"(?:wearing|wears|dressed in|dressed with|puts on)\s+(?:a|an|the|his|her|their)?\s*([A-Za-z]+(?:\s+[A-Za-z]+){{0,3}}?)\s+(?:{garments})",
+            rf"(?:a|an|the|his|her|their)?\s*([A-Za-z]+(?:\s+[A-Za-z]+){{0,3}}?)\s+(?:{garments})"
+        ]
+        self.effect_keywords = [
+            "explosion", "explodes", "exploding", "fire", "smoke", "rain", "storm", "lightning",
+            "thunder", "earthquake", "crash", "crashes", "shatter", "shatters", "shattering",
+            "blood", "bleeding", "gunshot", "shoots", "shooting", "fight", "fighting", "stunt",
+            "falls", "falling", "jumps", "jumping", "vfx", "cgi", "effect", "practical effect",
+            "slow motion", "timelapse", "makeup effect", "prosthetic", "animatronic", "pyrotechnic"
+        ]
+        
+        # Compile patterns once instead of on every extraction call
+        self._prop_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.prop_patterns]
+        self._prop_stop_words = frozenset(word.lower() for word in self.prop_stop_words)
+        self._wardrobe_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.wardrobe_patterns]
+        # Wardrobe matches only span letters and whitespace and end in a garment,
+        # so only runs of those characters that contain a garment need scanning
+        self._letter_run_re = re.compile(r"[A-Za-z\s]+", re.IGNORECASE)
+        self._garment_re = re.compile(rf"\s(?:{garments})", re.IGNORECASE)
+        # Vehicle and effect keywords share one alternation with a named group
+        # per category, so the text is scanned once for both; longer keywords
+        # go first so phrases win. The pattern is lowercase and meant for
+        # lowercased text, which avoids the slower case-insensitive matching
+        self._keyword_re = self._keyword_regex({
+            "vehicle": self.vehicle_keywords,
+            "effect": self.effect_keywords,
+        })
+        self._keyword_re_ignorecase = re.compile(self._keyword_re.pattern, re.IGNORECASE)
+    
+    @staticmethod
+    def _keyword_regex(keywords_by_group: Dict[str, Any]) -> "re.Pattern":
+        """
+        Compile a whole-word regex matching any of the lowercased keywords.
+        
+        Args:
+            keywords_by_group: Literal keywords keyed by the named group they match under
+            
+        Returns:
+            Compiled pattern; ``lastgroup`` of a match names its category
+        """
+        groups = []
+        for group, keywords in keywords_by_group.items():
+            lowered = sorted({k.lower() for k in keywords}, key=len, reverse=True)
+            groups.append(f"(?P<{group}>{'|'.join(re.escape(k) for k in lowered)})")
+        return re.compile(rf"\b(?:{'|'.join(groups)})\b")
     
     async def initialize(self):
-        """Load NLP models if not already loaded."""
+        """
+        Load NLP models if not already loaded.
+        
+        Called lazily on first extraction. The pipeline is shared with the
+        other analyzers; only NER (props) and the tagger, parser and attribute
+        ruler (vehicle descriptions) are run on it, so the lemmatizer is
+        disabled per call. The model is loaded in a worker thread so the
+        event loop isn't blocked.
+        """
         if not self.is_initialized:
-            logger.info(f"Loading spaCy model: {settings.SPACY_MODEL}")
-            self.nlp = spacy.load(settings.SPACY_MODEL)
+            self.nlp = await asyncio.to_thread(load_nlp, settings.SPACY_MODEL)
             self.is_initialized = True
             logger.info("NLP models loaded successfully")
     
+    def _parse(self, text: str) -> Doc:
+        """
+        Parse text with the NLP pipeline, reusing the Doc of an identical earlier text.
+        
+        Re-analyzing an unchanged script only deserializes the cached Doc
+        instead of running the full pipeline again. Texts shorter than
+        settings.NER_MIN_CHARS are parsed without the entity recognizer
+        unless they contain a capitalized word that could be an entity.
+        The pipeline is shared with other analyzers running in worker
+        threads, so parsing and deserializing hold its lock.
+        
+        Args:
+            text: Text to parse
+            
+        Returns:
+            spaCy Doc of text
+        """
+        key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        with self._doc_cache_lock:
+            cached = self._doc_cache.get(key)
+            if cached is not None:
+                self._doc_cache.move_to_end(key)
+        if cached is not None:
+            with self._nlp_lock:
+                return Doc(self.nlp.vocab).from_bytes(cached)
+        
+        disable = _DISABLED_PIPES
+        if len(text) < settings.NER_MIN_CHARS and not _ENTITY_CANDIDATE_RE.search(text):
+            disable = _DISABLED_PIPES + ["ner"]
+        with self._nlp_lock:
+            doc = self.nlp(text, disable=disable)
+            doc_bytes = doc.to_bytes()
+        with self._doc_cache_lock:
+            self._doc_cache[key] = doc_bytes
+            if len(self._doc_cache) > _DOC_CACHE_MAX_SIZE:
+                self._doc_cache.popitem(last=False)
+        return doc
+    
     async def extract_elements(self, parsed_script: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
         """
         Extract elements from parsed script.
@@ -47,6 +171,19 @@ class ElementExtractor:
         """
         await self.initialize()
         
+        # Parsing and pattern matching are CPU-bound; run them off the event loop
+        return await asyncio.to_thread(self._extract_elements, parsed_script)
+    
+    def _extract_elements(self, parsed_script: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Extract elements from parsed script synchronously.
+        
+        Args:
+            parsed_script: Dictionary of parsed script data
+            
+        Returns:
+            Dictionary of extracted elements by type
+        """
         results = {
             ElementType.CHARACTER: [],
             ElementType.LOCATION: [],
@@ -67,144 +204,172 @@ class ElementExtractor:
             })
         
         # Extract locations from scene headings
-        locations = {}
+        # Occurrences are kept as dict keys: ordered by first appearance, deduplicated in O(1)
+        location_scenes = defaultdict(dict)
         for scene in parsed_script.get('scenes', []):
             location = scene.get('location')
             if location:
-                scene_num = scene.get('scene_number', '')
-                if location not in locations:
-                    locations[location] = {'name': location, 'occurrences': [scene_num]}
-                else:
-                    if scene_num not in locations[location]['occurrences']:
-                        locations[location]['occurrences'].append(scene_num)
-        
-        for location in locations.values():
-            location['importance'] = len(location['occurrences']) / len(parsed_script.get('scenes', [])) if parsed_script.get('scenes') else 0
-            results[ElementType.LOCATION].append(location)
+                location_scenes[location][scene.get('scene_number', '')] = None
+        
+        scene_count = len(parsed_script.get('scenes', []))
+        for location, occurrences in location_scenes.items():
+            results[ElementType.LOCATION].append({
+                'name': location,
+                'occurrences': list(occurrences),
+                'importance': len(occurrences) / scene_count if scene_count else 0
+            })
         
         # Extract props, vehicles, and other elements from action lines
-        all_action_text = ""
-        scene_action_map = {}
+        # Collect the sections and their offsets, then join once
+        action_parts = []
+        scene_spans = _SceneSpans([], [], [])
+        offset = 0
         
         for scene in parsed_script.get('scenes', []):
             scene_num = scene.get('scene_number', '')
             scene_action = '\n'.join(scene.get('action', []))
             if scene_action:
-                all_action_text += scene_action + "\n"
-                scene_action_map[scene_action] = scene_num
+                action_parts.append(scene_action)
+                scene_spans.starts.append(offset)
+                scene_spans.ends.append(offset + len(scene_action))
+                scene_spans.scene_numbers.append(scene_num)
+                offset += len(scene_action) + 1
+        
+        all_action_text = "".join(f"{part}\n" for part in action_parts)
+        
+        # Parse the action text once; props and vehicles share the Doc
+        doc = self._parse(all_action_text)
+        
+        # Find vehicle and effect keywords in a single pass over the lowercased text
+        action_text_lower = all_action_text.lower()
+        if len(action_text_lower) == len(all_action_text):
+            keyword_iter = self._keyword_re.finditer(action_text_lower)
+        else:
+            # Lowercasing expanded some characters, so offsets would not line up
+            keyword_iter = self._keyword_re_ignorecase.finditer(all_action_text)
+        keyword_spans = defaultdict(list)
+        for match in keyword_iter:
+            keyword_spans[match.lastgroup].append(match.span())
         
         # Extract props using regex patterns
-        props = await self._extract_props_from_text(all_action_text, scene_action_map)
+        props = self._extract_props_from_text(all_action_text, doc, scene_spans)
         results[ElementType.PROP].extend(props)
         
         # Extract vehicles
-        vehicles = await self._extract_vehicles_from_text(all_action_text, scene_action_map)
+        vehicles = self._extract_vehicles_from_text(
+            all_action_text, doc, scene_spans, keyword_spans["vehicle"]
+        )
         results[ElementType.VEHICLE].extend(vehicles)
         
         # Extract wardrobe items
-        wardrobe = await self._extract_wardrobe_from_text(all_action_text, scene_action_map)
+        wardrobe = self._extract_wardrobe_from_text(all_action_text, scene_spans)
         results[ElementType.WARDROBE].extend(wardrobe)
         
         # Extract special effects
-        special_effects = await self._extract_special_effects_from_text(all_action_text, scene_action_map)
+        special_effects = self._extract_special_effects_from_text(
+            all_action_text, scene_spans, keyword_spans["effect"]
+        )
         results[ElementType.SPECIAL_EFFECT].extend(special_effects)
         
-        # Deduplicate elements
+        # Deduplicate elements, then cut the context of each survivor
         for element_type, elements in results.items():
             results[element_type] = self._deduplicate_elements(elements)
+            for element in results[element_type]:
+                element.pop('_lower', None)
+                context_span = element.pop('_context_span', None)
+                if context_span:
+                    element['context'] = all_action_text[context_span[0]:context_span[1]].strip()
         
         return results
     
-    async def _extract_props_from_text(self, text: str, scene_map: Dict[str, str]) -> List[Dict[str, Any]]:
+    def _extract_props_from_text(self, text: str, doc: Any, scene_spans: _SceneSpans) -> List[Dict[str, Any]]:
         """
         Extract props from text using regex patterns and NLP.
         
         Args:
             text: Text to extract props from
-            scene_map: Mapping of text sections to scene numbers
+            doc: spaCy Doc of text
+            scene_spans: Offsets of each scene's section in text
             
         Returns:
             List of extracted props
         """
         props = []
-        doc = self.nlp(text)
         
         # Use regex patterns to find props
-        for pattern in self.prop_patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
+        for pattern in self._prop_res:
+            for match in pattern.finditer(text):
                 prop_name = match.group(1).strip()
-                if prop_name.lower() not in self.prop_stop_words:
+                prop_lower = prop_name.lower()
+                if prop_lower not in self._prop_stop_words:
                     # Find which scene this belongs to
-                    scene_nums = self._find_scenes_for_span(match.span(), text, scene_map)
+                    scene_nums = self._find_scenes_for_span(match.span(), scene_spans)
                     
                     props.append({
                         'name': prop_name,
+                        '_lower': prop_lower,
                         'occurrences': scene_nums,
-                        'context': text[max(0, match.start() - 20):min(len(text), match.end() + 20)].strip()
+                        '_context_span': (max(0, match.start() - 20), min(len(text), match.end() + 20))
                     })
         
         # Use NLP to find objects
         for ent in doc.ents:
             if ent.label_ in ["PRODUCT", "WORK_OF_ART", "ORG"]:
-                if ent.text.lower() not in self.prop_stop_words:
-                    scene_nums = self._find_scenes_for_span(ent.start_char, text, scene_map)
+                ent_lower = ent.text.lower()
+                if ent_lower not in self._prop_stop_words:
+                    scene_nums = self._find_scenes_for_span(ent.start_char, scene_spans)
                     
                     props.append({
                         'name': ent.text,
+                        '_lower': ent_lower,
                         'occurrences': scene_nums,
-                        'context': text[max(0, ent.start_char - 20):min(len(text), ent.end_char + 20)].strip()
+                        '_context_span': (max(0, ent.start_char - 20), min(len(text), ent.end_char + 20))
                     })
         
         return props
     
-    async def _extract_vehicles_from_text(self, text: str, scene_map: Dict[str, str]) -> List[Dict[str, Any]]:
+    def _extract_vehicles_from_text(
+        self, text: str, doc: Any, scene_spans: _SceneSpans, keyword_spans: List[Tuple[int, int]]
+    ) -> List[Dict[str, Any]]:
         """
         Extract vehicles from text.
         
         Args:
             text: Text to extract vehicles from
-            scene_map: Mapping of text sections to scene numbers
+            doc: spaCy Doc of text
+            scene_spans: Offsets of each scene's section in text
+            keyword_spans: Spans of vehicle keywords in text
             
         Returns:
             List of extracted vehicles
         """
         vehicles = []
-        doc = self.nlp(text)
         
         # Look for vehicle keywords
-        for vehicle_word in self.vehicle_keywords:
-            for match in re.finditer(rf"\b{vehicle_word}\b", text, re.IGNORECASE):
-                scene_nums = self._find_scenes_for_span(match.span(), text, scene_map)
-                
-                # Get context around the match
-                start_idx = max(0, match.start() - 50)
-                end_idx = min(len(text), match.end() + 50)
-                context = text[start_idx:end_idx].strip()
-                
-                # Try to get a more specific vehicle description
-                vehicle_name = self._get_vehicle_description(match.start(), doc)
-                if not vehicle_name:
-                    vehicle_name = match.group(0)
-                
-                vehicles.append({
-                    'name': vehicle_name,
-                    'occurrences': scene_nums,
-                    'context': context
-                })
+        for start, end in keyword_spans:
+            scene_nums = self._find_scenes_for_span((start, end), scene_spans)
+            
+            # Try to get a more specific vehicle description
+            vehicle_name = self._get_vehicle_description(start, doc)
+            if not vehicle_name:
+                vehicle_name = text[start:end]
+            
+            vehicles.append({
+                'name': vehicle_name,
+                'occurrences': scene_nums,
+                '_context_span': (max(0, start - 50), min(len(text), end + 50))
+            })
         
         return vehicles
     
     def _get_vehicle_description(self, char_pos: int, doc: Any) -> str:
         """Get a more detailed vehicle description from surrounding text."""
-        # Find the token at this character position
-        token = None
-        for t in doc:
-            if t.idx <= char_pos < t.idx + len(t.text):
-                token = t
-                break
-        
-        if not token:
+        # Find the token at this character position; char_span looks it up
+        # by binary search instead of walking the whole Doc
+        span = doc.char_span(char_pos, char_pos + 1, alignment_mode="expand")
+        if not span:
             return ""
+        token = span[0]
         
         # Look for adjectives or compound modifiers
         modifiers = []
@@ -216,81 +381,72 @@ class ElementExtractor:
             return " ".join(modifiers) + " " + token.text
         return token.text
     
-    async def _extract_wardrobe_from_text(self, text: str, scene_map: Dict[str, str]) -> List[Dict[str, Any]]:
+    def _extract_wardrobe_from_text(self, text: str, scene_spans: _SceneSpans) -> List[Dict[str, Any]]:
         """
         Extract wardrobe items from text.
         
         Args:
             text: Text to extract wardrobe from
-            scene_map: Mapping of text sections to scene numbers
+            scene_spans: Offsets of each scene's section in text
             
         Returns:
             List of extracted wardrobe items
         """
         wardrobe_items = []
         
-        # Wardrobe-related patterns
-        wardrobe_patterns = [
-            r"(?:wearing|wears|dressed in|dressed with|puts on|wearing a|wearing an|in a|in an)\s+([A-Za-z]+(?:\s+[A-Za-z]+){0,3}?)\s+(?:jacket|shirt|dress|suit|pants|skirt|hat|coat|sweater|blouse|shoes|boots|uniform|costume|outfit)",
-            r"(?:wearing|wears|dressed in|dressed with|puts on)\s+(?:a|an|the|his|her|their)?\s*([A-Za-z]+(?:\s+[A-Za-z]+){0,3}?)\s+(?:jacket|shirt|dress|suit|pants|skirt|hat|coat|sweater|blouse|shoes|boots|uniform|costume|outfit)",
-            r"(?:a|an|the|his|her|their)?\s*([A-Za-z]+(?:\s+[A-Za-z]+){0,3}?)\s+(?:jacket|shirt|dress|suit|pants|skirt|hat|coat|sweater|blouse|shoes|boots|uniform|costume|outfit)"
+        garment_runs = [
+            run.span() for run in self._letter_run_re.finditer(text)
+            if self._garment_re.search(text, run.start(), run.end())
         ]
         
-        for pattern in wardrobe_patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                item_desc = match.group(0).strip()
-                scene_nums = self._find_scenes_for_span(match.span(), text, scene_map)
-                
-                wardrobe_items.append({
-                    'name': item_desc,
-                    'occurrences': scene_nums,
-                    'context': text[max(0, match.start() - 20):min(len(text), match.end() + 20)].strip()
-                })
+        for pattern in self._wardrobe_res:
+            for start, end in garment_runs:
+                for match in pattern.finditer(text, start, end):
+                    item_desc = match.group(0).strip()
+                    scene_nums = self._find_scenes_for_span(match.span(), scene_spans)
+                    
+                    wardrobe_items.append({
+                        'name': item_desc,
+                        'occurrences': scene_nums,
+                        '_context_span': (max(0, match.start() - 20), min(len(text), match.end() + 20))
+                    })
         
         return wardrobe_items
     
-    async def _extract_special_effects_from_text(self, text: str, scene_map: Dict[str, str]) -> List[Dict[str, Any]]:
+    def _extract_special_effects_from_text(
+        self, text: str, scene_spans: _SceneSpans, keyword_spans: List[Tuple[int, int]]
+    ) -> List[Dict[str, Any]]:
         """
         Extract special effects from text.
         
         Args:
             text: Text to extract special effects from
-            scene_map: Mapping of text sections to scene numbers
+            scene_spans: Offsets of each scene's section in text
+            keyword_spans: Spans of special effect keywords in text
             
         Returns:
             List of extracted special effects
         """
         special_effects = []
         
-        # Special effects keywords
-        effect_keywords = [
-            "explosion", "explodes", "exploding", "fire", "smoke", "rain", "storm", "lightning",
-            "thunder", "earthquake", "crash", "crashes", "shatter", "shatters", "shattering",
-            "blood", "bleeding", "gunshot", "shoots", "shooting", "fight", "fighting", "stunt",
-            "falls", "falling", "jumps", "jumping", "vfx", "cgi", "effect", "practical effect",
-            "slow motion", "timelapse", "makeup effect", "prosthetic", "animatronic", "pyrotechnic"
-        ]
-        
-        for keyword in effect_keywords:
-            for match in re.finditer(rf"\b{keyword}\b", text, re.IGNORECASE):
-                scene_nums = self._find_scenes_for_span(match.span(), text, scene_map)
-                
-                special_effects.append({
-                    'name': f"{keyword.title()} Effect",
-                    'occurrences': scene_nums,
-                    'context': text[max(0, match.start() - 30):min(len(text), match.end() + 30)].strip()
-                })
+        for start, end in keyword_spans:
+            scene_nums = self._find_scenes_for_span((start, end), scene_spans)
+            
+            special_effects.append({
+                'name': f"{text[start:end].lower().title()} Effect",
+                'occurrences': scene_nums,
+                '_context_span': (max(0, start - 30), min(len(text), end + 30))
+            })
         
         return special_effects
     
-    def _find_scenes_for_span(self, span, text: str, scene_map: Dict[str, str]) -> List[str]:
+    def _find_scenes_for_span(self, span, scene_spans: _SceneSpans) -> List[str]:
         """
         Find which scenes a text span belongs to.
         
         Args:
             span: Character span (start, end) or single position
-            text: Full text
-            scene_map: Mapping of text sections to scene numbers
+            scene_spans: Offsets of each scene's section in the text
             
         Returns:
             List of scene numbers
@@ -299,22 +455,29 @@ class ElementExtractor:
             start_pos, end_pos = span
         else:
             start_pos = end_pos = span
-            
-        matching_scenes = []
         
-        for section_text, scene_num in scene_map.items():
-            section_start = text.find(section_text)
-            if section_start == -1:
-                continue
-                
-            section_end = section_start + len(section_text)
-            
-            # If span overlaps with this section
-            if not (end_pos < section_start or start_pos > section_end):
-                matching_scenes.append(scene_num)
+        # Sections are sorted and disjoint, so the sections overlapping the
+        # span form one contiguous run
+        first = bisect_left(scene_spans.ends, start_pos)
+        last = bisect_right(scene_spans.starts, end_pos)
+        matching_scenes = scene_spans.scene_numbers[first:last]
         
         return matching_scenes if matching_scenes else ["unknown"]
     
+    @staticmethod
+    def _context_width(element: Dict[str, Any]) -> int:
+        """
+        Get the width of an element's context window.
+        
+        Args:
+            element: Element dictionary
+            
+        Returns:
+            Number of characters in the window, 0 if it has none
+        """
+        context_span = element.get('_context_span')
+        return context_span[1] - context_span[0] if context_span else 0
+    
     def _deduplicate_elements(self, elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Deduplicate elements by name and merge occurrences.
@@ -326,20 +489,29 @@ class ElementExtractor:
             Deduplicated element list
         """
         element_map = {}
+        # Occurrences already merged into each element, for O(1) membership checks
+        seen_occurrences = {}
         
         for element in elements:
-            name = element['name'].lower()
-            if name in element_map:
+            # Extractors that already lowercased the name store it under '_lower'
+            name = element.get('_lower') or element['name'].lower()
+            merged = element_map.get(name)
+            if merged is not None:
                 # Merge occurrences
+                seen = seen_occurrences[name]
                 for occurrence in element['occurrences']:
-                    if occurrence not in element_map[name]['occurrences']:
-                        element_map[name]['occurrences'].append(occurrence)
+                    if occurrence not in seen:
+                        seen.add(occurrence)
+                        merged['occurrences'].append(occurrence)
                 
-                # Update context if this one is better
-                if len(element.get('context', '')) > len(element_map[name].get('context', '')):
-                    element_map[name]['context'] = element.get('context')
+                # Keep the wider context window
+                if self._context_width(element) > self._context_width(merged):
+                    merged['_context_span'] = element['_context_span']
             else:
-                element_map[name] = element.copy()
+                merged = element.copy()
+                merged['occurrences'] = list(element['occurrences'])
+                element_map[name] = merged
+                seen_occurrences[name] = set(merged['occurrences'])
         
         # Update importance based on number of occurrences
         for name, element in element_map.items():
@@ -1,17 +1,67 @@
 """
 Scene analyzer service for calculating scene complexity, estimating durations, and analyzing scene content.
 """
+import asyncio
+import hashlib
 import logging
 import re
+from itertools import islice
 from typing import Dict, Any, List, Optional, Tuple
-import math
-import spacy
-from collections import Counter
+from collections import OrderedDict, defaultdict
+
+import orjson
+from spacy.attrs import LEMMA
 
 from app.core.config import settings
+from app.utils.nlp import load_nlp, pipeline_lock
 
 logger = logging.getLogger("filmpro")
 
+# Sentiment analysis only reads lemmas; the lemmatizer still needs the tagger
+# and attribute ruler, but not the parser or entity recognizer
+_SENTIMENT_DISABLED_PIPES = ["parser", "ner"]
+_SENTIMENT_BATCH_SIZE = 32
+
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+_MAX_KEY_ACTIONS = 5
+
+# Basic sentiment category of each emotion
+_SENTIMENT_BY_EMOTION = {
+    "anger": "negative",
+    "fear": "negative",
+    "joy": "positive",
+    "sadness": "negative",
+    "surprise": "neutral",
+    "disgust": "negative",
+    "anticipation": "neutral",
+    "trust": "positive"
+}
+
+# Recent analysis results, keyed by a digest of the scene fields they depend on
+_SCENE_CACHE_MAX_SIZE = 512
+_SCENE_KEY_FIELDS = (
+    "scene_number", "content", "characters", "action", "dialogue", "int_ext", "location", "time_of_day"
+)
+
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """
+    Build regex source matching the keywords stored in a character trie.
+    
+    Args:
+        node: Trie node mapping each next character to its child node; the
+            empty string marks the end of a keyword
+            
+    Returns:
+        Regex source in which keywords sharing a prefix share one branch
+    """
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    # Optional and greedy, so the longest keyword is still tried first
+    return f"(?:{body})?" if "" in node else body
+
 
 class SceneAnalyzer:
     """Analyzes scenes for complexity, duration estimates, and other metrics."""
@@ -19,7 +69,10 @@ class SceneAnalyzer:
     def __init__(self):
         """Initialize the scene analyzer."""
         self.nlp = None
+        self._nlp_lock = pipeline_lock(settings.SPACY_MODEL)
         self.is_initialized = False
+        # Serialized results, so every hit hands out a fresh copy
+        self._scene_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
         
         # Complexity factors
         self.complexity_factors = {
@@ -68,12 +121,70 @@ class SceneAnalyzer:
             "forest", "jungle", "desert", "snow", "beach", "cliff", "rooftop", "stairs",
             "restaurant", "bar", "crowd", "public", "stadium", "theater", "concert"
         }
+        
+        # Basic emotion keywords (could be expanded or replaced with a more sophisticated model)
+        self.emotion_keywords = {
+            "anger": {"angry", "fury", "rage", "furious", "mad", "outraged", "yells", "shouts", "screams", "fight", "argue"},
+            "fear": {"afraid", "scared", "terrified", "frightened", "fear", "panic", "horror", "dread", "trembles"},
+            "joy": {"happy", "joy", "delighted", "pleased", "smile", "laugh", "excited", "thrilled", "celebrate"},
+            "sadness": {"sad", "sorrow", "grief", "miserable", "depressed", "crying", "tears", "weeping", "sob"},
+            "surprise": {"surprised", "shocked", "amazed", "astonished", "stunned", "gasps", "unexpected"},
+            "disgust": {"disgusted", "revolted", "repulsed", "gross", "sickened", "nauseous"},
+            "anticipation": {"waiting", "expecting", "anticipated", "hope", "eager", "looking forward"},
+            "trust": {"trust", "belief", "faith", "confident", "rely", "depend", "honest"}
+        }
+        
+        # Emotions each keyword counts towards, for a single lookup per lemma
+        self._emotions_by_keyword = defaultdict(list)
+        for emotion, keywords in self.emotion_keywords.items():
+            for keyword in keywords:
+                self._emotions_by_keyword[keyword].append(emotion)
+        
+        # Strong action verbs that mark a key action sentence
+        self.action_verbs = frozenset({
+            "run", "jump", "fight", "grab", "throw", "hit", "shoot", "chase", "escape",
+            "climb", "fall", "crash", "explode", "break", "smash", "slam", "rush", "race",
+            "attack", "defend", "push", "pull", "lift", "drop", "enter", "exit", "kiss",
+            "embrace", "punch", "kick", "dive", "swim", "drive", "ride", "fly", "land"
+        })
+        
+        # Each keyword set becomes one prefix-trie alternation, so text is
+        # scanned once per set; longer keywords win so phrases like "car chase"
+        # count once
+        self._complexity_keyword_re = self._keyword_regex(self.complexity_keywords)
+        self._location_keyword_re = self._keyword_regex(self.complex_location_keywords)
+    
+    @staticmethod
+    def _keyword_regex(keywords) -> "re.Pattern":
+        """
+        Compile a whole-word regex matching any of the lowercased keywords.
+        
+        The keywords are merged into a prefix trie, so the regex engine tests
+        each shared prefix once instead of once per keyword.
+        
+        Args:
+            keywords: Iterable of literal lowercase keywords
+            
+        Returns:
+            Compiled pattern
+        """
+        trie = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        return re.compile(rf"\b{_trie_pattern(trie)}\b")
     
     async def initialize(self):
-        """Load NLP models if not already loaded."""
+        """
+        Load NLP models if not already loaded.
+        
+        The pipeline is shared with every other analyzer that loads the same
+        model, and is loaded in a worker thread so the event loop isn't blocked.
+        """
         if not self.is_initialized:
-            logger.info(f"Loading spaCy model for scene analysis: {settings.SPACY_MODEL}")
-            self.nlp = spacy.load(settings.SPACY_MODEL)
+            self.nlp = await asyncio.to_thread(load_nlp, settings.SPACY_MODEL)
             self.is_initialized = True
             logger.info("NLP models loaded successfully for scene analysis")
     
@@ -87,8 +198,117 @@ class SceneAnalyzer:
         Returns:
             Dictionary with analysis results
         """
+        key = self._scene_key(scene_data)
+        cached = self._get_cached_scene(key)
+        if cached is not None:
+            return cached
+        
         await self.initialize()
         
+        # Parsing and analysis are CPU-bound; run them off the event loop
+        result = await asyncio.to_thread(self._analyze_scenes_sync, [scene_data])
+        return self._cache_scene(key, result[0])
+    
+    async def analyze_scenes(self, scenes_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several scenes, parsing their content in one batch.
+        
+        Args:
+            scenes_data: Scene dictionaries from the parser
+            
+        Returns:
+            Analysis results, in the order of scenes_data
+        """
+        keys = [self._scene_key(scene_data) for scene_data in scenes_data]
+        results = [self._get_cached_scene(key) for key in keys]
+        
+        # Only scenes that aren't cached go through the pipeline
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            await self.initialize()
+            
+            analyzed = await asyncio.to_thread(self._analyze_scenes_sync, [scenes_data[i] for i in misses])
+            for i, result in zip(misses, analyzed):
+                results[i] = self._cache_scene(keys[i], result)
+        
+        return results
+    
+    def _analyze_scenes_sync(self, scenes_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze scenes synchronously, parsing their content in one batch.
+        
+        The pipeline is shared with other analyzers running in worker
+        threads, so the batch is parsed while holding its lock; the analysis
+        of the parsed scenes runs after the lock is released.
+        
+        Args:
+            scenes_data: Scene dictionaries from the parser
+            
+        Returns:
+            Analysis results, in the order of scenes_data
+        """
+        contents = [scene_data.get("content", "") for scene_data in scenes_data]
+        with self._nlp_lock:
+            docs = list(self.nlp.pipe(contents, batch_size=_SENTIMENT_BATCH_SIZE, disable=_SENTIMENT_DISABLED_PIPES))
+        return [self._analyze_scene(scene_data, doc) for scene_data, doc in zip(scenes_data, docs)]
+    
+    @staticmethod
+    def _scene_key(scene_data: Dict[str, Any]) -> bytes:
+        """
+        Get the cache key of a scene.
+        
+        Args:
+            scene_data: Dictionary containing scene information from the parser
+            
+        Returns:
+            Digest of the scene fields the analysis reads
+        """
+        fields = orjson.dumps([scene_data.get(field) for field in _SCENE_KEY_FIELDS], default=str)
+        return hashlib.blake2b(fields, digest_size=16).digest()
+    
+    def _get_cached_scene(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Get a copy of a cached scene analysis.
+        
+        Args:
+            key: Scene cache key
+            
+        Returns:
+            Analysis results, or None if the scene isn't cached
+        """
+        cached = self._scene_cache.get(key)
+        if cached is None:
+            return None
+        self._scene_cache.move_to_end(key)
+        return orjson.loads(cached)
+    
+    def _cache_scene(self, key: bytes, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cache a scene analysis, evicting the least recently used one when full.
+        
+        Args:
+            key: Scene cache key
+            result: Analysis results
+            
+        Returns:
+            The same analysis results
+        """
+        self._scene_cache[key] = orjson.dumps(result)
+        if len(self._scene_cache) > _SCENE_CACHE_MAX_SIZE:
+            self._scene_cache.popitem(last=False)
+        return result
+    
+    def _analyze_scene(self, scene_data: Dict[str, Any], doc: Any) -> Dict[str, Any]:
+        """
+        Analyze a scene whose content has already been parsed.
+        
+        Args:
+            scene_data: Dictionary containing scene information from the parser
+            doc: spaCy Doc of the scene content
+            
+        Returns:
+            Dictionary with analysis results
+        """
         # Extract scene properties
         scene_number = scene_data.get("scene_number", "")
         slug_line = scene_data.get("slug_line", "")
@@ -102,7 +322,10 @@ class SceneAnalyzer:
         
         # Calculate basic metrics
         character_count = len(characters)
-        dialogue_line_count = sum(len(d.get("lines", [])) for d in dialogue)
+        dialogue_line_count = scene_data.get("dialogue_line_count")
+        if dialogue_line_count is None:
+            # Scenes parsed before the parser tracked the count
+            dialogue_line_count = sum(len(d.get("lines", [])) for d in dialogue)
         action_line_count = len(action_lines)
         total_line_count = dialogue_line_count + action_line_count
         
@@ -111,7 +334,7 @@ class SceneAnalyzer:
         action_density = action_line_count / total_line_count if total_line_count > 0 else 0
         
         # Check for complexity keywords in content
-        complexity_keyword_matches = self._count_keyword_matches(content, self.complexity_keywords)
+        complexity_keyword_matches = self._count_keyword_matches(content.lower(), self._complexity_keyword_re)
         has_complex_elements = complexity_keyword_matches > 0
         
         # Calculate location complexity
@@ -139,7 +362,7 @@ class SceneAnalyzer:
         )
         
         # Perform sentiment analysis on the scene
-        emotions, overall_sentiment = await self._analyze_sentiment(content)
+        emotions, overall_sentiment = self._analyze_sentiment(doc)
         
         # Identify key actions in the scene
         key_actions = self._extract_key_actions(action_lines)
@@ -165,26 +388,22 @@ class SceneAnalyzer:
             "key_actions": key_actions
         }
     
-    def _count_keyword_matches(self, text: str, keywords: set) -> int:
-        """Count the number of matches for complexity keywords in text."""
-        text = text.lower()
-        count = 0
-        for keyword in keywords:
-            count += len(re.findall(r'\b' + re.escape(keyword) + r'\b', text))
-        return min(count, 10)  # Cap at 10 to prevent outliers
+    def _count_keyword_matches(self, text_lower: str, keyword_re: "re.Pattern") -> int:
+        """Count the number of matches for complexity keywords in lowercased text."""
+        # Cap at 10 to prevent outliers; the scan stops at the cap
+        return len(list(islice(keyword_re.finditer(text_lower), 10)))
     
     def _calculate_location_complexity(self, int_ext: str, location: str) -> float:
         """Calculate the complexity factor for a location."""
         # Base complexity from INT/EXT
         base_complexity = 0.5  # Default
-        if int_ext and int_ext.lower() in self.location_type_complexity:
-            base_complexity = self.location_type_complexity[int_ext.lower()]
+        if int_ext:
+            base_complexity = self.location_type_complexity.get(int_ext.lower(), base_complexity)
         
         # Check for complex location keywords
         location_complexity_factor = 0.0
         if location:
-            location = location.lower()
-            keyword_count = self._count_keyword_matches(location, self.complex_location_keywords)
+            keyword_count = self._count_keyword_matches(location.lower(), self._location_keyword_re)
             location_complexity_factor = min(keyword_count * 0.1, 0.5)  # Up to 0.5 additional complexity
         
         return min(base_complexity + location_complexity_factor, 1.0)
@@ -194,7 +413,13 @@ class SceneAnalyzer:
         if not time_of_day:
             return 0.5  # Default complexity
         
-        time_of_day = time_of_day.lower()
+        time_of_day = time_of_day.strip().lower()
+        
+        # Most headings name exactly one time of day; no key contains another,
+        # so an exact hit is what the substring scan below would find
+        complexity = self.time_complexity.get(time_of_day)
+        if complexity is not None:
+            return complexity
         
         for time_key, complexity in self.time_complexity.items():
             if time_key in time_of_day:
@@ -202,7 +427,9 @@ class SceneAnalyzer:
         
         return 0.5  # Default if no match
     
-    def _calculate_complexity_score(self, **factors) -> float:
+    def _calculate_complexity_score(self, character_count: int = 0, dialogue_density: float = 0.5,
+                                    action_density: float = 0.5, special_elements: int = 0,
+                                    location_complexity: float = 0.5, time_complexity: float = 0.5) -> float:
         """
         Calculate overall scene complexity score (0-1 scale).
         
@@ -218,25 +445,20 @@ class SceneAnalyzer:
             Complexity score (0-1 scale)
         """
         # Normalize character count (0-10+ scale to 0-1)
-        character_factor = min(factors.get("character_count", 0) / 10.0, 1.0)
+        character_factor = min(character_count / 10.0, 1.0)
         
         # Special elements (0-10 scale to 0-1)
-        special_factor = min(factors.get("special_elements", 0) / 10.0, 1.0)
+        special_factor = min(special_elements / 10.0, 1.0)
         
-        # Get other factors directly (already 0-1)
-        dialogue_factor = factors.get("dialogue_density", 0.5)
-        action_factor = factors.get("action_density", 0.5)
-        location_factor = factors.get("location_complexity", 0.5)
-        time_factor = factors.get("time_complexity", 0.5)
-        
-        # Weighted sum
+        # Weighted sum; the other factors are already 0-1
+        weights = self.complexity_factors
         complexity = (
-            character_factor * self.complexity_factors["character_count"] +
-            dialogue_factor * self.complexity_factors["dialogue_density"] +
-            action_factor * self.complexity_factors["action_density"] +
-            special_factor * self.complexity_factors["special_elements"] +
-            location_factor * self.complexity_factors["location_complexity"] +
-            time_factor * self.complexity_factors["time_complexity"]
+            character_factor * weights["character_count"] +
+            dialogue_density * weights["dialogue_density"] +
+            action_density * weights["action_density"] +
+            special_factor * weights["special_elements"] +
+            location_complexity * weights["location_complexity"] +
+            time_complexity * weights["time_complexity"]
         )
         
         # Ensure it's in 0-1 range and round to 2 decimals
@@ -277,66 +499,36 @@ class SceneAnalyzer:
         # Round to nearest 0.1 minute
         return round(duration, 1)
     
-    async def _analyze_sentiment(self, content: str) -> Tuple[Dict[str, float], str]:
+    def _analyze_sentiment(self, doc: Any) -> Tuple[Dict[str, float], str]:
         """
         Analyze the emotional content of a scene.
         
         Args:
-            content: Scene content text
+            doc: spaCy Doc of the scene content
             
         Returns:
             Tuple of (emotion_scores, overall_sentiment)
         """
-        if not content:
+        if not len(doc):
             return {}, "neutral"
         
-        # Basic emotion keywords (could be expanded or replaced with a more sophisticated model)
-        emotion_keywords = {
-            "anger": {"angry", "fury", "rage", "furious", "mad", "outraged", "yells", "shouts", "screams", "fight", "argue"},
-            "fear": {"afraid", "scared", "terrified", "frightened", "fear", "panic", "horror", "dread", "trembles"},
-            "joy": {"happy", "joy", "delighted", "pleased", "smile", "laugh", "excited", "thrilled", "celebrate"},
-            "sadness": {"sad", "sorrow", "grief", "miserable", "depressed", "crying", "tears", "weeping", "sob"},
-            "surprise": {"surprised", "shocked", "amazed", "astonished", "stunned", "gasps", "unexpected"},
-            "disgust": {"disgusted", "revolted", "repulsed", "gross", "sickened", "nauseous"},
-            "anticipation": {"waiting", "expecting", "anticipated", "hope", "eager", "looking forward"},
-            "trust": {"trust", "belief", "faith", "confident", "rely", "depend", "honest"}
-        }
-        
-        # Analyze text using spaCy
-        doc = self.nlp(content)
-        
-        # Count emotion keywords
-        emotion_counts = {emotion: 0 for emotion in emotion_keywords}
-        for token in doc:
-            for emotion, keywords in emotion_keywords.items():
-                if token.lemma_.lower() in keywords:
-                    emotion_counts[emotion] += 1
-        
-        # Normalize counts to get scores (0-1 range)
-        max_count = max(emotion_counts.values()) if emotion_counts.values() else 1
-        emotion_scores = {emotion: count / max_count if max_count > 0 else 0 
-                          for emotion, count in emotion_counts.items() if count > 0}
-        
-        # Determine overall sentiment
-        if not emotion_scores:
+        # Count emotion keywords; count_by tallies lemmas in C, so only each
+        # distinct lemma is looked up in Python
+        emotion_counts = {emotion: 0 for emotion in self.emotion_keywords}
+        for lemma, count in doc.count_by(LEMMA).items():
+            for emotion in self._emotions_by_keyword.get(doc.vocab.strings[lemma].lower(), ()):
+                emotion_counts[emotion] += count
+        
+        # The dominant emotion is the first with the highest count
+        dominant_emotion = max(emotion_counts, key=emotion_counts.get)
+        max_count = emotion_counts[dominant_emotion]
+        if not max_count:
             return {}, "neutral"
         
-        # Get dominant emotion
-        dominant_emotion = max(emotion_scores.items(), key=lambda x: x[1])[0]
-        
-        # Map to basic sentiment categories
-        sentiment_mapping = {
-            "anger": "negative",
-            "fear": "negative",
-            "joy": "positive",
-            "sadness": "negative",
-            "surprise": "neutral",
-            "disgust": "negative",
-            "anticipation": "neutral",
-            "trust": "positive"
-        }
+        # Normalize counts to get scores (0-1 range)
+        emotion_scores = {emotion: count / max_count for emotion, count in emotion_counts.items() if count}
         
-        return emotion_scores, sentiment_mapping.get(dominant_emotion, "neutral")
+        return emotion_scores, _SENTIMENT_BY_EMOTION.get(dominant_emotion, "neutral")
     
     def _extract_key_actions(self, action_lines: List[str]) -> List[str]:
         """
@@ -354,26 +546,15 @@ class SceneAnalyzer:
         # Join all action lines
         all_action = " ".join(action_lines)
         
-        # Split into sentences
-        sentences = re.split(r'[.!?]+', all_action)
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        # Find sentences with strong action verbs
-        action_verbs = {
-            "run", "jump", "fight", "grab", "throw", "hit", "shoot", "chase", "escape",
-            "climb", "fall", "crash", "explode", "break", "smash", "slam", "rush", "race",
-            "attack", "defend", "push", "pull", "lift", "drop", "enter", "exit", "kiss",
-            "embrace", "punch", "kick", "dive", "swim", "drive", "ride", "fly", "land"
-        }
-        
+        # Find sentences with strong action verbs, stopping once there are enough
         key_actions = []
-        for sentence in sentences:
-            words = sentence.lower().split()
-            if any(verb in words for verb in action_verbs):
-                # Clean up the sentence
-                clean_sentence = sentence.strip()
-                if clean_sentence and len(clean_sentence) > 10:  # Avoid very short fragments
-                    key_actions.append(clean_sentence)
-        
-        # Limit to top 5 key actions
-        return key_actions[:5]
\ No newline at end of file
+        for sentence in _SENTENCE_SPLIT_RE.split(all_action):
+            clean_sentence = sentence.strip()
+            if len(clean_sentence) <= 10:  # Avoid very short fragments
+                continue
+            if not self.action_verbs.isdisjoint(clean_sentence.lower().split()):
+                key_actions.append(clean_sentence)
+                if len(key_actions) == _MAX_KEY_ACTIONS:
+                    break
+        
+        return key_actions
\ No newline at end of file
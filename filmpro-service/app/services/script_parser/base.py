@@ -4,13 +4,29 @@ Base class for script parsers.
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
-import hashlib
 import logging
+import os
+import re
+
+import blake3
 
 from app.models.script import Script, ScriptFormat
 
 logger = logging.getLogger("filmpro")
 
+# Cap BLAKE3's hashing threads so large files don't starve the server workers
+_HASH_MAX_THREADS = min(os.cpu_count() or 1, 8)
+
+# Length in bytes of the BLAKE3 digests stored as script content hashes
+CONTENT_HASH_LENGTH = 16
+
+# Scene heading prefixes and the INT/EXT value each one stands for
+_INT_EXT_PREFIX_RE = re.compile(r'(INT/EXT|I/E|INT|EXT)\.')
+_INT_EXT_BY_PREFIX = {"INT": "INT", "EXT": "EXT", "INT/EXT": "INT/EXT", "I/E": "INT/EXT"}
+
+# How much of a file without a known suffix is read to sniff its format
+_SNIFF_BYTES = 1024
+
 
 class ScriptParserBase(ABC):
     """Base class for all script parsers."""
@@ -32,22 +48,31 @@ class ScriptParserBase(ABC):
         pass
     
     @staticmethod
-    def calculate_file_hash(file_path: str) -> str:
+    def create_content_hasher() -> blake3.blake3:
+        """
+        Create a BLAKE3 hasher for script content.
+        
+        Returns:
+            Hasher whose digest, taken with CONTENT_HASH_LENGTH, matches
+            calculate_file_hash
+        """
+        return blake3.blake3(max_threads=_HASH_MAX_THREADS)
+    
+    @staticmethod
+    def calculate_file_hash(file_path: str) -> bytes:
         """
-        Calculate MD5 hash of a file.
+        Calculate BLAKE3 hash of a file.
         
         Args:
             file_path: Path to the file
             
         Returns:
-            MD5 hash string
+            16-byte BLAKE3 digest
         """
-        md5_hash = hashlib.md5()
-        with open(file_path, "rb") as f:
-            # Read in chunks to handle large files
-            for chunk in iter(lambda: f.read(4096), b""):
-                md5_hash.update(chunk)
-        return md5_hash.hexdigest()
+        # Memory-map the file and let BLAKE3 hash its subtrees in parallel
+        hasher = ScriptParserBase.create_content_hasher()
+        hasher.update_mmap(file_path)
+        return hasher.digest(length=CONTENT_HASH_LENGTH)
     
     @staticmethod
     def detect_format(file_path: str) -> ScriptFormat:
@@ -69,18 +94,23 @@ class ScriptParserBase(ABC):
         elif suffix == ".fdx":
             return ScriptFormat.FINAL_DRAFT
         else:
-            # Try to detect format by content
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read(1000)  # Read first 1000 chars
-                
-                # Check for Final Draft XML
-                if "<?xml" in content and "<FinalDraft" in content:
-                    return ScriptFormat.FINAL_DRAFT
-                
-                # Check for Fountain markers
-                if "INT." in content or "EXT." in content:
-                    if "FADE IN:" in content or "CUT TO:" in content:
-                        return ScriptFormat.FOUNTAIN
+            # Try to detect format by content; the markers are ASCII, so the
+            # raw header is searched without decoding it
+            with open(file_path, "rb") as f:
+                head = f.read(_SNIFF_BYTES)
+            
+            # Check for the PDF magic number
+            if head.startswith(b"%PDF"):
+                return ScriptFormat.PDF
+            
+            # Check for Final Draft XML
+            if b"<?xml" in head and b"<FinalDraft" in head:
+                return ScriptFormat.FINAL_DRAFT
+            
+            # Check for Fountain markers
+            if b"INT." in head or b"EXT." in head:
+                if b"FADE IN:" in head or b"CUT TO:" in head:
+                    return ScriptFormat.FOUNTAIN
             
             # Default to plain text if we can't determine
             return ScriptFormat.PLAIN_TEXT
@@ -98,28 +128,16 @@ class ScriptParserBase(ABC):
         """
         line = line.strip()
         
-        # Default values
-        int_ext = None
-        location = None
-        time_of_day = None
-        
         # Check for INT/EXT
-        if line.startswith("INT."):
-            int_ext = "INT"
-            line = line[4:].strip()
-        elif line.startswith("EXT."):
-            int_ext = "EXT"
-            line = line[4:].strip()
-        elif line.startswith("INT/EXT.") or line.startswith("I/E."):
-            int_ext = "INT/EXT"
-            line = line[line.find(".")+1:].strip()
+        int_ext = None
+        prefix_match = _INT_EXT_PREFIX_RE.match(line)
+        if prefix_match:
+            int_ext = _INT_EXT_BY_PREFIX[prefix_match.group(1)]
+            line = line[prefix_match.end():].strip()
         
-        # Split by dash to separate location and time
-        parts = line.split(" - ")
-        if len(parts) > 1:
-            location = parts[0].strip()
-            time_of_day = parts[1].strip()
-        else:
-            location = line.strip()
+        # Split by dash to separate location and time; only the first
+        # segment after the location is the time of day
+        location, separator, rest = line.partition(" - ")
+        time_of_day = rest.partition(" - ")[0].strip() if separator else None
         
-        return int_ext, location, time_of_day
\ No newline at end of file
+        return int_ext, location.strip(), time_of_day
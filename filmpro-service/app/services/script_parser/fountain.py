@@ -2,9 +2,11 @@
 Parser for Fountain format scripts.
 Fountain is a plain text markup format for screenplays.
 """
+import asyncio
 import re
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from itertools import chain
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 
 from app.services.script_parser.base import ScriptParserBase
 
@@ -22,149 +24,185 @@ class FountainParser(ScriptParserBase):
     PAGE_BREAK_PATTERN = re.compile(r'^==+$')
     SCENE_NUMBER_PATTERN = re.compile(r'#(.+)#')
     
+    # Page breaks, scene headings, character cues and parentheticals never
+    # overlap, so one match per line classifies it; lastgroup names the kind
+    LINE_PATTERN = re.compile(
+        r'(?P<page_break>==+)'
+        r'|(?P<scene_heading>(?i:INT|EXT|I/E|INT/EXT)[\./].*)'
+        r'|(?P<character>[A-Z\s]+)'
+        r'|(?P<parenthetical>\(.*\))'
+    )
+    
     async def parse(self, file_path: str) -> Dict[str, Any]:
         """
         Parse a Fountain script file.
         
+        Parsing is CPU-bound, so it runs in a worker thread to keep the event
+        loop responsive while large scripts are processed.
+        
         Args:
             file_path: Path to the Fountain script file
             
         Returns:
             Dictionary with parsed script data
         """
-        logger.info(f"Parsing Fountain script: {file_path}")
-        
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        return await asyncio.to_thread(self._parse_file, file_path)
+    
+    def _parse_file(self, file_path: str) -> Dict[str, Any]:
+        """
+        Parse a Fountain script file synchronously.
         
-        # Split the script into lines
-        lines = content.split('\n')
+        Args:
+            file_path: Path to the Fountain script file
+            
+        Returns:
+            Dictionary with parsed script data
+        """
+        logger.info(f"Parsing Fountain script: {file_path}")
         
         # Initialize data structures
         scenes = []
         characters = {}
         current_scene = None
+        # Lines of the current scene's content, joined once the scene is complete
+        content_lines = []
         current_character = None
         current_dialogue = None
         in_dialogue = False
         scene_number_counter = 1
         page_number = 1
-        metadata = self._extract_metadata(lines)
         
-        # Process the script line by line
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Skip empty lines
-            if not line:
-                continue
-            
-            # Page breaks
-            if self.PAGE_BREAK_PATTERN.match(line):
-                page_number += 1
-                continue
+        # Stream the script line by line instead of reading and splitting it whole
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            metadata, header_lines = self._extract_metadata(f)
             
-            # Scene headings
-            if self.SCENE_HEADING_PATTERN.match(line) or line.startswith('.'):
-                # If we were in a scene, save it
-                if current_scene:
-                    scenes.append(current_scene)
-                
-                # Extract scene number if present
-                scene_number = str(scene_number_counter)
-                scene_number_match = self.SCENE_NUMBER_PATTERN.search(line)
-                if scene_number_match:
-                    scene_number = scene_number_match.group(1)
-                    line = self.SCENE_NUMBER_PATTERN.sub('', line).strip()
+            # Process the script line by line, replaying the header read for metadata
+            for line in chain(header_lines, f):
+                line = line.strip()
                 
-                # Remove leading dot if forced scene heading
-                if line.startswith('.'):
-                    line = line[1:].strip()
+                # Skip empty lines
+                if not line:
+                    continue
                 
-                # Extract INT/EXT, location, time of day
-                int_ext, location, time_of_day = self.extract_scene_heading(line)
+                line_match = self.LINE_PATTERN.fullmatch(line)
+                line_kind = line_match.lastgroup if line_match else None
                 
-                # Create new scene
-                current_scene = {
-                    'scene_number': scene_number,
-                    'slug_line': line,
-                    'page_number': page_number,
-                    'int_ext': int_ext,
-                    'location': location,
-                    'time_of_day': time_of_day,
-                    'content': line + '\n',
-                    'characters': [],
-                    'dialogue': [],
-                    'action': []
-                }
-                
-                scene_number_counter += 1
-                in_dialogue = False
-                continue
-            
-            # Character
-            if not in_dialogue and self.CHARACTER_PATTERN.match(line) and not line.startswith('!'):
-                current_character = line
-                in_dialogue = True
-                current_dialogue = {
-                    'character': current_character,
-                    'lines': [],
-                    'parentheticals': []
-                }
+                # Page breaks
+                if line_kind == 'page_break':
+                    page_number += 1
+                    continue
                 
-                # Add character to scene
-                if current_scene and current_character not in current_scene['characters']:
-                    current_scene['characters'].append(current_character)
+                # Scene headings
+                if line_kind == 'scene_heading' or line.startswith('.'):
+                    # If we were in a scene, save it
+                    if current_scene:
+                        current_scene['content'] = '\n'.join(content_lines) + '\n'
+                        scenes.append(current_scene)
+                    
+                    # Extract scene number if present
+                    scene_number = str(scene_number_counter)
+                    scene_number_match = self.SCENE_NUMBER_PATTERN.search(line)
+                    if scene_number_match:
+                        scene_number = scene_number_match.group(1)
+                        line = self.SCENE_NUMBER_PATTERN.sub('', line).strip()
+                    
+                    # Remove leading dot if forced scene heading
+                    if line.startswith('.'):
+                        line = line[1:].strip()
+                    
+                    # Extract INT/EXT, location, time of day
+                    int_ext, location, time_of_day = self.extract_scene_heading(line)
+                    
+                    # Create new scene
+                    current_scene = {
+                        'scene_number': scene_number,
+                        'slug_line': line,
+                        'page_number': page_number,
+                        'int_ext': int_ext,
+                        'location': location,
+                        'time_of_day': time_of_day,
+                        'content': '',  # Set from content_lines when the scene ends
+                        'characters': [],
+                        'dialogue': [],
+                        'action': [],
+                        # Total lines across 'dialogue', kept up to date so
+                        # analyzers don't have to re-walk it
+                        'dialogue_line_count': 0
+                    }
+                    
+                    content_lines = [line]
+                    scene_number_counter += 1
+                    in_dialogue = False
+                    continue
                 
-                # Add/update character in overall list
-                if current_character not in characters:
-                    characters[current_character] = {
-                        'name': current_character,
-                        'dialogue_count': 1,
-                        'word_count': 0,
-                        'scenes': [current_scene['scene_number']] if current_scene else []
+                # Character
+                if not in_dialogue and line_kind == 'character' and not line.startswith('!'):
+                    current_character = line
+                    in_dialogue = True
+                    current_dialogue = {
+                        'character': current_character,
+                        'lines': [],
+                        'parentheticals': []
                     }
-                else:
-                    characters[current_character]['dialogue_count'] += 1
-                    if current_scene and current_scene['scene_number'] not in characters[current_character]['scenes']:
-                        characters[current_character]['scenes'].append(current_scene['scene_number'])
+                    
+                    # Add character to scene
+                    if current_scene and current_character not in current_scene['characters']:
+                        current_scene['characters'].append(current_character)
+                    
+                    # Add/update character in overall list; scenes are kept as
+                    # dict keys for O(1) dedup in order of first appearance
+                    if current_character not in characters:
+                        characters[current_character] = {
+                            'name': current_character,
+                            'dialogue_count': 1,
+                            'word_count': 0,
+                            'scenes': {current_scene['scene_number']: None} if current_scene else {}
+                        }
+                    else:
+                        characters[current_character]['dialogue_count'] += 1
+                        if current_scene:
+                            characters[current_character]['scenes'][current_scene['scene_number']] = None
+                    
+                    continue
                 
-                continue
-            
-            # Parenthetical
-            if in_dialogue and self.PARENTHETICAL_PATTERN.match(line):
-                if current_dialogue:
-                    current_dialogue['parentheticals'].append(line)
-                continue
-            
-            # Dialogue
-            if in_dialogue and current_dialogue is not None:
-                current_dialogue['lines'].append(line)
-                word_count = len(line.split())
-                if current_character in characters:
-                    characters[current_character]['word_count'] += word_count
+                # Parenthetical
+                if in_dialogue and line_kind == 'parenthetical':
+                    if current_dialogue:
+                        current_dialogue['parentheticals'].append(line)
+                    continue
+                
+                # Dialogue
+                if in_dialogue and current_dialogue is not None:
+                    current_dialogue['lines'].append(line)
+                    word_count = len(line.split())
+                    if current_character in characters:
+                        characters[current_character]['word_count'] += word_count
+                    
+                    if current_scene:
+                        content_lines.append(line)
+                    continue
                 
+                # Action lines
                 if current_scene:
-                    current_scene['content'] += line + '\n'
-                continue
-            
-            # Action lines
-            if current_scene:
-                current_scene['action'].append(line)
-                current_scene['content'] += line + '\n'
-            
-            # End of dialogue
-            in_dialogue = False
-            if current_dialogue and current_scene:
-                current_scene['dialogue'].append(current_dialogue)
-                current_dialogue = None
+                    current_scene['action'].append(line)
+                    content_lines.append(line)
+                
+                # End of dialogue
+                in_dialogue = False
+                if current_dialogue and current_scene:
+                    current_scene['dialogue'].append(current_dialogue)
+                    current_scene['dialogue_line_count'] += len(current_dialogue['lines'])
+                    current_dialogue = None
         
         # Add the last scene if there is one
         if current_scene:
+            current_scene['content'] = '\n'.join(content_lines) + '\n'
             scenes.append(current_scene)
         
         # Convert characters dictionary to list
         character_list = list(characters.values())
+        for character in character_list:
+            character['scenes'] = list(character['scenes'])
         
         return {
             'scenes': scenes,
@@ -172,23 +210,28 @@ class FountainParser(ScriptParserBase):
             'metadata': metadata
         }
     
-    def _extract_metadata(self, lines: List[str]) -> Dict[str, Any]:
+    def _extract_metadata(self, lines: Iterable[str]) -> Tuple[Dict[str, Any], List[str]]:
         """
         Extract metadata from the script.
         
         Fountain metadata is in the format:
         Key: Value
         
+        Only the header is consumed from lines, so the caller can keep
+        reading the script from the same iterator.
+        
         Args:
             lines: Script lines
             
         Returns:
-            Dictionary of metadata
+            Dictionary of metadata and the raw lines consumed to find it
         """
         metadata = {}
         in_metadata = True
+        header_lines = []
         
         for line in lines:
+            header_lines.append(line)
             line = line.strip()
             if not line:
                 continue
@@ -205,4 +248,4 @@ class FountainParser(ScriptParserBase):
                     value = parts[1].strip()
                     metadata[key] = value
         
-        return metadata
\ No newline at end of file
+        return metadata, header_lines
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Shared spaCy model loading for the FILMPRO analysis services.
+"""
+import logging
+import threading
+from typing import Dict
+
+import spacy
+from spacy.language import Language
+
+logger = logging.getLogger("filmpro")
+
+# Loaded pipelines, keyed by model name
+_pipelines: Dict[str, Language] = {}
+# Held while loading, so concurrent first calls don't each load the model
+_load_lock = threading.Lock()
+# One lock per model; spaCy doesn't guarantee that a pipeline and its shared
+# Vocab/StringStore can be used from several threads at once
+_pipeline_locks: Dict[str, threading.Lock] = {}
+
+
+def load_nlp(model_name: str) -> Language:
+    """
+    Load a spaCy pipeline once per process.
+    
+    The full pipeline is loaded and shared by every analyzer that uses the
+    model; callers leave out the components they don't need with
+    ``disable=`` on each call instead of loading their own trimmed copy.
+    
+    Args:
+        model_name: Name of the spaCy model package
+        
+    Returns:
+        Loaded spaCy pipeline
+    """
+    with _load_lock:
+        nlp = _pipelines.get(model_name)
+        if nlp is None:
+            logger.info(f"Loading spaCy model: {model_name}")
+            nlp = spacy.load(model_name)
+            _pipelines[model_name] = nlp
+        return nlp
+
+
+def pipeline_lock(model_name: str) -> threading.Lock:
+    """
+    Get the lock that serializes use of a model's shared pipeline.
+    
+    Running the pipeline and deserializing Docs against its vocab must hold
+    this lock, since analyses run in worker threads concurrently.
+    
+    Args:
+        model_name: Name of the spaCy model package
+        
+    Returns:
+        Lock shared by every user of the model's pipeline
+    """
+    with _load_lock:
+        return _pipeline_locks.setdefault(model_name, threading.Lock())
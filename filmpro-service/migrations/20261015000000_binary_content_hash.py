@@ -0,0 +1,61 @@
+"""
+Recompute script content hashes stored before they became binary digests.
+
+Scripts uploaded before content hashes were stored as 16-byte BLAKE3 digests
+still have a hex string, which never equals the digest of a re-upload, so the
+unique (production_id, content_hash) index no longer deduplicates them. This
+rehashes their files and drops the single-field content_hash index, which no
+query uses.
+
+Run with: beanie migrate -uri "$MONGO_URI" -db "$MONGO_DB_NAME" -p migrations
+"""
+import asyncio
+import logging
+
+from beanie import free_fall_migration
+from pymongo.errors import OperationFailure
+
+from app.models.script import Script
+from app.services.script_parser.base import ScriptParserBase
+
+logger = logging.getLogger("filmpro")
+
+
+class Forward:
+    @free_fall_migration(document_models=[Script])
+    async def rehash_content(self, session):
+        collection = Script.get_motor_collection()
+        legacy = collection.find(
+            {"content_hash": {"$type": "string"}}, projection={"file_path": 1, "production_id": 1}, session=session
+        )
+        async for script in legacy:
+            try:
+                content_hash = await asyncio.to_thread(
+                    ScriptParserBase.calculate_file_hash, script["file_path"]
+                )
+            except FileNotFoundError:
+                logger.warning(f"Script {script['_id']} has no file at {script['file_path']}; hash left as is")
+                continue
+            
+            # A script re-uploaded since the hash format changed already holds
+            # the digest; check first, as a failed write would abort the transaction
+            duplicate = await collection.find_one(
+                {"production_id": script["production_id"], "content_hash": content_hash},
+                projection={"_id": 1}, session=session
+            )
+            if duplicate is not None:
+                logger.warning(f"Script {script['_id']} duplicates script {duplicate['_id']}; hash left as is")
+                continue
+            
+            await collection.update_one(
+                {"_id": script["_id"]}, {"$set": {"content_hash": content_hash}}, session=session
+            )
+        
+        try:
+            await collection.drop_index("content_hash_1", session=session)
+        except OperationFailure:
+            pass  # Already dropped
+
+
+class Backward:
+    pass
@@ -0,0 +1,184 @@
+"""
+Tests for the script analysis services.
+"""
+import re
+from collections import Counter
+
+import pytest
+
+from app.models.script import ElementType
+from app.services.script_analysis.character_analyzer import CharacterAnalyzer
+from app.services.script_analysis.element_extractor import ElementExtractor, _SceneSpans
+
+
+class _FakeEntity:
+    """Named entity found by _FakeNlp."""
+    
+    def __init__(self, label, text, start_char):
+        self.label_ = label
+        self.text = text
+        self.start_char = start_char
+        self.end_char = start_char + len(text)
+
+
+class _FakeDoc:
+    """Doc exposing only what the extractor reads when no vehicles are mentioned."""
+    
+    def __init__(self, ents):
+        self.ents = ents
+    
+    def to_bytes(self):
+        return b""
+
+
+class _FakeNlp:
+    """Stands in for a spaCy pipeline, recognizing a fixed set of entities unless NER is disabled."""
+    
+    def __init__(self, entities=()):
+        self.entities = entities
+        self.disabled = []
+    
+    def __call__(self, text, disable=()):
+        self.disabled.append(list(disable))
+        if "ner" in disable:
+            return _FakeDoc([])
+        return _FakeDoc([
+            _FakeEntity(label, name, text.index(name)) for label, name in self.entities if name in text
+        ])
+
+
+@pytest.fixture
+def character_analyzer():
+    return CharacterAnalyzer()
+
+
+def _extract(action_by_scene, entities=()):
+    """Run element extraction over scenes with the given action lines."""
+    extractor = ElementExtractor()
+    extractor.nlp = _FakeNlp(entities)
+    scenes = [
+        {"scene_number": scene_number, "action": action}
+        for scene_number, action in action_by_scene.items()
+    ]
+    return extractor, extractor._extract_elements({"scenes": scenes, "characters": []})
+
+
+def test_dialogue_style_counts_questions_and_exclamations(character_analyzer):
+    style = character_analyzer._calculate_dialogue_style("why? stop! ok.")
+    
+    # One of the three sentences is a question and one an exclamation
+    assert style["question_frequency"] == 0.33
+    assert style["exclamation_frequency"] == 0.33
+
+
+def test_dialogue_style_average_sentence_length(character_analyzer):
+    style = character_analyzer._calculate_dialogue_style("why? stop! ok.")
+    
+    assert style["avg_sentence_length"] == 1.0
+    assert style["vocabulary_richness"] == 1.0
+
+
+def test_find_indicators_counts_indicators_inside_compounds(character_analyzer):
+    _, _, categories = character_analyzer._find_indicators("her ex-husband")
+    
+    assert set(categories[1]) == {
+        ("relationship", "romantic"), ("relationship", "family"), ("gender", "male")
+    }
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("a middle-aged man", ("age", "senior")),
+    ("a young adult", ("age", "child")),
+    ("a young adult", ("age", "teen")),
+    ("his best friend", ("relationship", "friendship")),
+])
+def test_find_indicators_keeps_nested_categories(character_analyzer, text, expected):
+    _, _, categories = character_analyzer._find_indicators(text)
+    
+    assert any(expected in hit for hit in categories)
+
+
+def test_count_near_only_counts_indicators_within_30_chars(character_analyzer):
+    text = "a rival waits outside for a very long time. her boss nods at john, who meets his ex-wife."
+    name_re = re.compile(r"\bjohn\b")
+    
+    counts = character_analyzer._count_near(name_re, text, character_analyzer._find_indicators(text))
+    
+    # "rival" is too far before the name to count
+    assert counts == Counter({
+        ("gender", "female"): 2,
+        ("gender", "male"): 1,
+        ("relationship", "professional"): 1,
+        ("relationship", "romantic"): 1,
+        ("relationship", "family"): 1,
+    })
+
+
+def test_count_near_without_indicators(character_analyzer):
+    text = "john waits"
+    
+    assert character_analyzer._count_near(
+        re.compile(r"\bjohn\b"), text, character_analyzer._find_indicators(text)
+    ) == Counter()
+
+
+def test_short_text_without_entity_candidates_skips_ner():
+    extractor, results = _extract({"1": ["She is holding a knife."]}, entities=[("ORG", "Acme")])
+    
+    assert "ner" in extractor.nlp.disabled[0]
+    assert [prop["name"] for prop in results[ElementType.PROP]] == ["knife"]
+
+
+def test_short_text_with_entity_candidate_keeps_entity_props():
+    extractor, results = _extract({"1": ["She opens a box from Acme and smiles."]}, entities=[("ORG", "Acme")])
+    
+    assert "ner" not in extractor.nlp.disabled[0]
+    assert [prop["name"] for prop in results[ElementType.PROP]] == ["Acme"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    (
+        "She wears a red dress, then 2 blue hats.\nHe puts on his old jacket;(black coat)!",
+        ["wears a red dress", "puts on his old jacket", "She wears a red dress", "blue hat", "black coat"]
+    ),
+    ("Bob, in a torn suit.3 green shirts", ["in a torn suit", "green shirt"]),
+])
+def test_wardrobe_matches_next_to_punctuation_and_digits(text, expected):
+    extractor = ElementExtractor()
+    scene_spans = _SceneSpans([0], [len(text)], ["1"])
+    
+    items = extractor._extract_wardrobe_from_text(text, scene_spans)
+    
+    # Scanning only the letter runs around garments finds what scanning the whole text does
+    unfiltered = [match.group(0).strip() for pattern in extractor._wardrobe_res for match in pattern.finditer(text)]
+    assert [item["name"] for item in items] == unfiltered
+    assert list(dict.fromkeys(item["name"] for item in items)) == expected
+
+
+def test_effect_offsets_survive_lowercasing_that_changes_length():
+    # "İ" lowercases to two characters, so the case-insensitive scan is used
+    extractor, results = _extract({
+        "1": ["A storm rolls in over İstanbul."],
+        "2": ["Smoke. FIRE spreads."],
+    })
+    
+    effects = {effect["name"]: effect for effect in results[ElementType.SPECIAL_EFFECT]}
+    assert list(effects) == ["Storm Effect", "Smoke Effect", "Fire Effect"]
+    assert effects["Storm Effect"]["occurrences"] == ["1"]
+    assert effects["Fire Effect"]["occurrences"] == ["2"]
+    assert effects["Fire Effect"]["context"] == "olls in over İstanbul.\nSmoke. FIRE spreads."
+
+
+def test_prop_in_several_scenes_keeps_the_widest_context():
+    extractor, results = _extract({
+        "1": ["Holding a knife."],
+        "2": ["Much later, the old man is holding a knife. He waits."],
+    })
+    
+    # The first match's window is clipped at the start of the text, so the second one is used
+    assert results[ElementType.PROP] == [{
+        "name": "knife",
+        "occurrences": ["1", "2"],
+        "importance": 0.2,
+        "context": "ter, the old man is holding a knife. He waits."
+    }]
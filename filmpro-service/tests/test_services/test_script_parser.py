@@ -0,0 +1,96 @@
+"""
+Tests for the script parsers.
+"""
+from app.services.script_parser.fountain import FountainParser
+
+SAMPLE_FOUNTAIN = """\
+Title: The Test
+Author: Jane Doe
+Draft date: 2024-01-01
+
+INT. KITCHEN - DAY
+
+Mary pours coffee.
+
+MARY
+(quietly)
+Good morning.
+
+.ROOFTOP - NIGHT #7#
+
+===
+
+John looks at the stars.
+
+JOHN
+Where is everyone?
+
+EXT. GARDEN - DAY - CONTINUOUS
+
+MARY
+Out here!
+"""
+
+EXPECTED_PARSE = {
+    "scenes": [
+        {
+            "scene_number": "1",
+            "slug_line": "INT. KITCHEN - DAY",
+            "page_number": 1,
+            "int_ext": "INT",
+            "location": "KITCHEN",
+            "time_of_day": "DAY",
+            "content": "INT. KITCHEN - DAY\nMary pours coffee.\nGood morning.\n",
+            "characters": ["MARY"],
+            "dialogue": [],
+            "action": ["Mary pours coffee."],
+            "dialogue_line_count": 0
+        },
+        {
+            "scene_number": "7",
+            "slug_line": "ROOFTOP - NIGHT",
+            "page_number": 1,
+            "int_ext": None,
+            "location": "ROOFTOP",
+            "time_of_day": "NIGHT",
+            "content": "ROOFTOP - NIGHT\nJohn looks at the stars.\nWhere is everyone?\n",
+            "characters": ["JOHN"],
+            # A dialogue block is only closed by the next action line, which
+            # here is in the scene after the one it was spoken in
+            "dialogue": [
+                {"character": "MARY", "lines": ["Good morning."], "parentheticals": ["(quietly)"]}
+            ],
+            "action": ["John looks at the stars."],
+            "dialogue_line_count": 1
+        },
+        {
+            "scene_number": "3",
+            "slug_line": "EXT. GARDEN - DAY - CONTINUOUS",
+            "page_number": 2,
+            "int_ext": "EXT",
+            "location": "GARDEN",
+            "time_of_day": "DAY",
+            "content": "EXT. GARDEN - DAY - CONTINUOUS\nOut here!\n",
+            "characters": ["MARY"],
+            "dialogue": [],
+            "action": [],
+            "dialogue_line_count": 0
+        }
+    ],
+    "characters": [
+        {"name": "MARY", "dialogue_count": 2, "word_count": 4, "scenes": ["1", "3"]},
+        {"name": "JOHN", "dialogue_count": 1, "word_count": 3, "scenes": ["7"]}
+    ],
+    "metadata": {"Title": "The Test", "Author": "Jane Doe", "Draft date": "2024-01-01"}
+}
+
+
+async def test_fountain_parse_matches_golden_output(tmp_path):
+    script_path = tmp_path / "sample.fountain"
+    script_path.write_text(SAMPLE_FOUNTAIN, encoding="utf-8")
+    
+    parsed = await FountainParser().parse(str(script_path))
+    
+    assert parsed == EXPECTED_PARSE
+    # Dict equality ignores key order, so check the scene field order separately
+    assert [list(scene) for scene in parsed["scenes"]] == [list(scene) for scene in EXPECTED_PARSE["scenes"]]